@@ -1,10 +1,12 @@
 #backend.py
-import openai
+import openai_client
 import os
 import subprocess
+import sys
 import re
 from pathlib import Path
-import tempfile
+import shutil
+import uuid
 import time
 from concurrent.futures import ThreadPoolExecutor
 
@@ -12,59 +14,106 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
-client = openai.OpenAI(api_key=os.environ["OPENAI_API_KEY"])
+client = openai_client.get_client()
    
-from manim_examples import EXAMPLES  
+from example_index import select_examples
+import render_cache
+import render_scheduler
+from render_scheduler import run_pinned
+import tex_cache
+import partial_cache
+from ffmpeg_utils import concat_audio, concat_videos, mux_audio_video
+from scene_sections import split_sections
+from render_cost import RenderBudgetExceeded, estimate_render_cost, fit_budget
+from render_profiles import PREVIEW_PROFILE, apply_profile
+from hls_stream import HlsStream, delete_expired_streams, stream_partials
+import warm_render
+from render_workspace import OUTPUT_NAME, RenderWorkspace, strip_reserved_flags
+from manim_validator import ManimValidationError, validate_manim_code
+from llm_cache import cached_chat_completion, cached_chat_completion_with_reason, cached_stream_chat_completion
+
+# "subprocess" spawns manim per render; "warm" renders in pre-imported worker processes
+RENDER_BACKEND = os.environ.get("MATHINQ_RENDER_BACKEND", "subprocess")
+# start render + voiceover as soon as the python block closes instead of after the full completion
+STREAM_GENERATION = os.environ.get("MATHINQ_STREAM_GENERATION", "0") == "1"
+# bounded recovery: re-prompt with the render error / ask to continue a cut-off reply
+MAX_REPAIR_ATTEMPTS = int(os.environ.get("MATHINQ_MAX_REPAIR_ATTEMPTS", "2"))
+MAX_CONTINUATIONS = int(os.environ.get("MATHINQ_MAX_CONTINUATIONS", "2"))
+# mux the narration into the mp4 so clients fetch one file instead of syncing two
+MUX_AUDIO = os.environ.get("MATHINQ_MUX_AUDIO", "1") != "0"
+# publish partial movie files as a live HLS playlist while the render is still running
+HLS_STREAMING = os.environ.get("MATHINQ_HLS_STREAMING", "0") == "1"
+# render a scene's sections in parallel processes and concat them
+PARALLEL_SECTIONS = os.environ.get("MATHINQ_PARALLEL_SECTIONS", "0") == "1"
+# stream the narration and synthesize it sentence by sentence, TTS_WORKERS at a time
+STREAM_NARRATION = os.environ.get("MATHINQ_STREAM_NARRATION", "1") != "0"
+TTS_WORKERS = int(os.environ.get("MATHINQ_TTS_WORKERS", "4"))
+# shorter sentences wait for the next one, so clips aren't a word or two each
+MIN_TTS_CHARS = 40
+
+CONTINUE_PROMPT = (
+    "Your previous reply was cut off. Continue exactly where it stopped. "
+    "Do not repeat anything that was already written and do not restart the code block."
+)
+
+REPAIR_PROMPT = """The code you wrote failed before producing a video:
+
+{error}
+
+Fix the problem. Reply with the complete corrected script in a ```python block and the command in a ```bash block."""
+
+# Everything static goes in the system message, ahead of the few-shot examples, and the
+# user's query comes last: the provider caches the longest identical prompt prefix.
+MANIM_SYSTEM_PROMPT = (
+    "You output ONLY valid Manim CE Python code. "
+    "Use exactly one Scene class. "
+    "No explanations. No comments. "
+
+    "All mathematical notation MUST be rendered with MathTex or Tex. "
+    "Never put LaTeX delimiters like '$', '$$', '\\(', '\\)', '\\[', '\\]' "
+    "inside Text strings. "
+
+    "Examples of correct usage:\n"
+    "    eq = MathTex('x^2 + 3x + 2 = 0')\n"
+    "    label = VGroup(Text('Solve'), MathTex('x^2+3x+2=0')).arrange(RIGHT)\n"
+
+    "If you want plain English text, use Text with no LaTeX. "
+    "If you want math, use MathTex/Tex. Do NOT display raw '$$...$$' in the scene. "
+
+    "Do NOT use axes.get_tangent_line. If you want a tangent, use "
+    "TangentLine(graph, x0, length=..., color=...); otherwise, just don't show the tangent."
+    """
 
-def manim_gen_prompt(user_query):
-    return (
-        f"""
-Create a Manim animation for the following math problem: {user_query}
+Each request is a math problem to turn into a Manim animation.
 Bash commands should be enclosed by ```bash ``` and python code should be enclosed by ```python ```
 
 
 You should write a self-contained class that can then be run to create a short-explanatory video. Your generated code should have no issues with compilation or execution and should include any relevant imports.
 Be super sure that the video doesn't include overlapping elements. If you run out of space, clear the screen.
 Ensure all objects remain fully visible within the default frame. Center all objects and scale them if necessary. Consider using scale_to_fit_width and scale_to_fit_height to avoid writing stuff out of frame.
-Feel free to incorporate the layout manager into your code.
+A layout helper is installed in the render environment; use it with `from mathinq_layout import LayoutManager`
+(methods: autoscale(mobj, max_ratio), safe_position(mobj, pos), pull_inside(mobj), place_top_left/top_right/bottom_left/bottom_right/center(mobj)).
+Import it; never define your own LayoutManager class.
 
 
 Please include the bash command to run the script and the python code itself. In the bash command to render the code, choose a frame rate of 25.
 Please make the command start with manim -ql -r 480, 270 --fps 10
 """
-    )
+)
 
 
-def generate_manim_code(user_query):
+def manim_gen_prompt(user_query):
+    return f"Create a Manim animation for the following math problem: {user_query}"
+
+
+def build_manim_messages(user_query):
     #generating the manim code using the prompt below
     user_prompt = manim_gen_prompt(user_query)
 
-    messages = [
-        {
-            "role": "system",
-            "content": (
-                "You output ONLY valid Manim CE Python code. "
-                "Use exactly one Scene class. "
-                "No explanations. No comments. "
-
-                "All mathematical notation MUST be rendered with MathTex or Tex. "
-                "Never put LaTeX delimiters like '$', '$$', '\\(', '\\)', '\\[', '\\]' "
-                "inside Text strings. "
-
-                "Examples of correct usage:\n"
-                "    eq = MathTex('x^2 + 3x + 2 = 0')\n"
-                "    label = VGroup(Text('Solve'), MathTex('x^2+3x+2=0')).arrange(RIGHT)\n"
-
-                "If you want plain English text, use Text with no LaTeX. "
-                "If you want math, use MathTex/Tex. Do NOT display raw '$$...$$' in the scene. "
-
-                "Do NOT use axes.get_tangent_line. If you want a tangent, use "
-                "TangentLine(graph, x0, length=..., color=...); otherwise, just don't show the tangent."
-            ),
-        },
-    ]
+    messages = [{"role": "system", "content": MANIM_SYSTEM_PROMPT}]
 
-    for example in EXAMPLES[:2]:
+    # only the library examples closest to this query, within the few-shot token budget
+    for example in select_examples(user_query):
         messages.append({
             "role": "user",
             "content": example["user"],
@@ -78,15 +127,55 @@ def generate_manim_code(user_query):
         "role": "user",
         "content": user_prompt,
     })
+    return messages
+
 
-    response = client.chat.completions.create(
+def is_truncated(response: str, finish_reason=None) -> bool:
+    """True when the model hit max_tokens or left the python block unclosed."""
+    if finish_reason == "length":
+        return True
+    return "```python" in response and get_closed_python_code(response) is None
+
+
+def complete_manim_response(messages, response: str, finish_reason=None) -> str:
+    """
+    If the response was cut off, ask the model to continue it (up to MAX_CONTINUATIONS times)
+    instead of regenerating the whole script.
+    """
+    continuations = 0
+    while is_truncated(response, finish_reason) and continuations < MAX_CONTINUATIONS:
+        continuations += 1
+        print(f"✂️ Response truncated — requesting continuation {continuations}/{MAX_CONTINUATIONS}")
+        follow_up = messages + [
+            {"role": "assistant", "content": response},
+            {"role": "user", "content": CONTINUE_PROMPT},
+        ]
+        more, finish_reason = cached_chat_completion_with_reason(
+            client,
+            model="gpt-4.1",
+            messages=follow_up,
+            temperature=0,
+            max_tokens=2000,
+            label="manim_continue",
+        )
+        response += more
+    return response
+
+
+def request_manim_code(messages) -> str:
+    response, finish_reason = cached_chat_completion_with_reason(
+        client,
         model="gpt-4.1",
         messages=messages,
         temperature=0,
         max_tokens=2000,
+        label="manim",
     )
+    return complete_manim_response(messages, response, finish_reason)
+
 
-    gpt_response = response.choices[0].message.content
+def generate_manim_code(user_query):
+    gpt_response = request_manim_code(build_manim_messages(user_query))
     print("manim code:", gpt_response)
     print("\n\n")
     return gpt_response
@@ -136,125 +225,608 @@ def get_manim_command(response: str):
     raise Exception("❌ No valid Manim command found in GPT response.")
 
 
-def generate_manim_video(code: str, command: str, output_dir="outputs"):
+def check_manim_code(manim_code: str) -> str:
     """
-    Generates a Manim video from code and command, saves it in output_dir,
-    and returns the path to the generated MP4.
+    Runs the static validator before any render CPU is spent.
+    Returns the (possibly auto-fixed) code, or raises with the rules that fired.
     """
-    os.makedirs(output_dir, exist_ok=True)
+    report = validate_manim_code(manim_code)
+    print(f"🔎 Validation: {report.summary()}")
+    if not report.ok:
+        raise ManimValidationError(report)
+    return report.code
 
-    with tempfile.NamedTemporaryFile(suffix=".py", delete=False) as tmp_file:
-        tmp_file.write(code.encode("utf-8"))
-        tmp_filename = tmp_file.name
 
-    parts = command.split()
-    for i, p in enumerate(parts):
-        if p.endswith(".py"):
-            parts[i] = tmp_filename
+def stream_manim_code(user_query):
+    """
+    Same request as generate_manim_code, but yields the completion text as it streams in.
+    """
+    return cached_stream_chat_completion(
+        client,
+        model="gpt-4.1",
+        messages=build_manim_messages(user_query),
+        temperature=0,
+        max_tokens=2000,
+        label="manim",
+    )
+
+
+def get_closed_python_code(partial: str):
+    """
+    Returns the python block from a (possibly still streaming) response once its
+    closing fence has arrived, otherwise None.
+    """
+    match = re.search(r"```python\s*(.*?)\s*```", partial, re.DOTALL)
+    if match:
+        return match.group(1).strip()
+    return None
+
 
-    # run manim command w/ subprocess
+def default_manim_command(code: str) -> str:
+    """
+    The command the prompt asks for, used when the python block arrives before the bash block.
+    """
+    match = re.search(r"class\s+(\w+)\s*\([\w.]*Scene\)", code)
+    scene_name = match.group(1) if match else ""
+    return f"manim -ql -r 480,270 --fps 10 scene.py {scene_name}".strip()
+
+
+def get_render_command(response: str, code: str) -> str:
+    """The model's bash block if there is one, otherwise the default command for the code."""
+    match = re.search(r"```bash\s*(.*?)\s*```", response, re.DOTALL)
+    if match:
+        return match.group(1).strip()
+    return default_manim_command(code)
+
+
+class RenderError(Exception):
+    """A render that produced no video; stderr holds manim's output when there is one."""
+
+    def __init__(self, message: str, stderr: str = ""):
+        super().__init__(message)
+        self.stderr = stderr
+
+
+def generate_manim_video(code: str, command: str, output_dir="outputs"):
+    """
+    Generates a Manim video from code and command, saves it in output_dir,
+    and returns the path to the generated MP4 (None if the render failed).
+    """
     try:
-        subprocess.run(parts, check=True, capture_output=True, text=True)
-    except subprocess.CalledProcessError as e:
+        return render_manim_video(code, command, output_dir)
+    except RenderError as e:
         print("❌ Manim render failed:")
-        print(e.stderr)
+        print(e.stderr or e)
         return None
 
-    # getting the video file
-    videos = list(Path("media/videos").rglob("*.mp4"))
-    if not videos:
-        print("⚠️ No video file found.")
-        return None
 
-    latest_video = max(videos, key=os.path.getmtime)
-    saved_path = Path(output_dir) / latest_video.name
-    latest_video.rename(saved_path)
+def render_env():
+    """
+    Environment for subprocess renders. They run inside the scratch workspace, so the
+    shared cache directories are passed as absolute paths rather than re-resolved there.
+    """
+    return {
+        **os.environ,
+        "MATHINQ_TEX_CACHE_DIR": str(tex_cache.TEX_CACHE_DIR),
+        "MATHINQ_PARTIAL_CACHE_DIR": str(partial_cache.PARTIAL_CACHE_DIR),
+    }
+
+
+def render_manim_video(code: str, command: str, output_dir="outputs", stream=None,
+                       low_priority=False, profile=PREVIEW_PROFILE) -> str:
+    """
+    generate_manim_video, but raises RenderError instead of returning None.
+    The model's quality flags are replaced by the named render profile, and scenes over the
+    profile's budget (see render_cost) are rendered at a lower fps or rejected before rendering.
+    Each render runs in its own scratch workspace, which is removed afterwards.
+    If stream (an HlsStream) is given, finished partial movie files are published to it live.
+    low_priority renders wait behind every normal render and run reniced.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    cost = estimate_render_cost(code)
+    try:
+        fps = fit_budget(cost, profile)
+    except RenderBudgetExceeded as e:
+        raise RenderError("Scene exceeds the render budget.", str(e))
+    print(f"📐 Render cost estimate ({profile}): {cost.to_dict(fps)}")
+    command = apply_profile(command, profile, fps=fps)
+
+    with RenderWorkspace(code) as workspace:
+        script_path = str(workspace.script_path)
+
+        parts = strip_reserved_flags(command.split())
+        if not any(p.endswith(".py") for p in parts):
+            parts.append(script_path)
+        for i, p in enumerate(parts):
+            if p.endswith(".py"):
+                parts[i] = script_path
+
+        # same scene + same flags -> reuse the mp4 we already rendered
+        cache_key = render_cache.render_key(code, render_cache.render_flags(parts, script_path))
+        # a copy of its own per render, as callers move, mux and delete what they get back
+        cached_path = render_cache.fetch(cache_key, Path(output_dir) / f"{workspace.root.name}.mp4")
+        if cached_path:
+            print(f"✅ Render cache hit: {cached_path}")
+            if stream is not None:
+                # nothing to publish, but players are waiting for the end of the playlist
+                stream.finish()
+            return cached_path
+
+        render_args = parts[1:]
+        parts[1:1] = workspace.manim_args()
+
+        # run manim (subprocess or warm worker) once the scheduler gives us a slot
+        try:
+            with render_scheduler.scheduler.slot(low_priority) as slot, stream_partials(workspace.partial_movie_dir, stream):
+                if RENDER_BACKEND == "warm":
+                    warm_render.pool.render(
+                        script_path, render_args, str(workspace.media_dir), OUTPUT_NAME, slot.cpus
+                    )
+                else:
+                    # run manim's CLI through tex_cache.py so Tex compiles share the locked cache
+                    run_pinned(
+                        [sys.executable, tex_cache.__file__, *parts[1:]], slot,
+                        niceness=19 if low_priority else 0, cwd=workspace.root, env=render_env(),
+                    )
+        except (subprocess.CalledProcessError, warm_render.WarmRenderError) as e:
+            raise RenderError("Manim render failed.", e.stderr or "")
+
+        if not workspace.output_path.exists():
+            raise RenderError("⚠️ No video file found.")
+
+        saved_path = Path(output_dir) / f"{workspace.root.name}.mp4"
+        shutil.move(str(workspace.output_path), saved_path)
+
+    render_cache.store(cache_key, str(saved_path))
     print(f"✅ Video saved to: {saved_path}")
 
     return str(saved_path)
 
 
 
-def generate_voiceover_from_manim_code(manim_code: str, output_dir="outputs", filename="voiceover.mp3"):
+def render_manim_video_sections(code: str, command: str, output_dir="outputs", stream=None,
+                                low_priority=False, profile=PREVIEW_PROFILE) -> str:
+    """
+    render_manim_video, split at section boundaries (see scene_sections) with each section
+    rendered by its own manim process via "-n first,last", then joined without re-encoding.
+    Scenes that can't be split safely render in one piece as usual.
+    """
+    sections = split_sections(code, render_scheduler.scheduler.max_concurrent)
+    if not sections:
+        return render_manim_video(code, command, output_dir, stream, low_priority, profile)
+
+    print(f"🧩 Rendering {len(sections)} sections in parallel: {sections}")
+    with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+        futures = [
+            executor.submit(
+                render_manim_video, code, f"{command} -n {first},{last}",
+                output_dir, None, low_priority, profile,
+            )
+            for first, last in sections
+        ]
+        # collect every result so no section file is left behind when one fails
+        paths, errors = [], []
+        for future in futures:
+            try:
+                paths.append(future.result())
+            except (RenderError, warm_render.WarmWorkerCrashed) as e:
+                errors.append(e)
+
+    try:
+        if errors:
+            raise errors[0]
+        output_path = str(Path(output_dir) / f"{uuid.uuid4()}.mp4")
+        try:
+            concat_videos(paths, output_path)
+        except (subprocess.CalledProcessError, OSError) as e:
+            raise RenderError("Concatenating sections failed.", getattr(e, "stderr", None) or str(e))
+    finally:
+        for path in paths:
+            os.remove(path)
+
+    print(f"✅ Video saved to: {output_path}")
+    return output_path
+
+
+def trim_traceback(text: str, max_lines: int = 30) -> str:
+    """Last max_lines of manim's output, without colour codes or rich box drawing."""
+    text = re.sub(r"\x1b\[[0-9;]*m", "", text)
+    lines = [line.strip(" │╭╮╰╯─") for line in text.splitlines()]
+    lines = [line for line in lines if line.strip()]
+    return "\n".join(lines[-max_lines:])
+
+
+def render_with_repair(messages, response: str, output_dir="outputs", cancel_event=None, progress=None):
+    """
+    Renders the code in response. On a validation or render failure, feeds the trimmed
+    error back to the model as a follow-up turn and re-renders, up to MAX_REPAIR_ATTEMPTS times.
+    Each render attempt gets a fresh live stream (announced through progress), which is
+    ended however the attempt goes.
+    Returns (video_path, manim_code, manim_command) for the render that worked,
+    or (None, None, None) if every attempt failed. A crashed warm worker
+    (warm_render.WarmWorkerCrashed) is no fault of the code, so it fails the job unrepaired.
+    """
+    for attempt in range(MAX_REPAIR_ATTEMPTS + 1):
+        _check_cancelled(cancel_event)
+        stream = None
+        try:
+            manim_code = check_manim_code(get_python_code(response))
+            manim_command = get_render_command(response, manim_code)
+            render = render_manim_video_sections if PARALLEL_SECTIONS else render_manim_video
+            stream = open_hls_stream(progress)
+            video_path = render(manim_code, manim_command, output_dir, stream=stream)
+            return video_path, manim_code, manim_command
+        except RenderError as e:
+            error = trim_traceback(e.stderr) or str(e)
+        except ManimValidationError as e:
+            error = e.report.summary()
+        finally:
+            # players stop polling a playlist once it has #EXT-X-ENDLIST
+            if stream is not None and not stream.finished:
+                stream.finish()
+
+        print(f"❌ Render attempt {attempt + 1} failed:\n{error}")
+        if attempt == MAX_REPAIR_ATTEMPTS:
+            break
+
+        print(f"🔧 Asking the model for a fix ({attempt + 1}/{MAX_REPAIR_ATTEMPTS})...")
+        messages = messages + [
+            {"role": "assistant", "content": response},
+            {"role": "user", "content": REPAIR_PROMPT.format(error=error)},
+        ]
+        response = request_manim_code(messages)
+
+    return None, None, None
+
+
+# static instructions first, the code (the only variable part) last
+NARRATION_SYSTEM_PROMPT = """
+You are an educational narrator. Based on the Manim Python code you are given,
+write a clear, very concise spoken explanation (the manim animations will do most of the explaining) that could accompany
+the animation for a math learner. Make it sound like a teacher explaining a concept.
+Get the timing correct in what you're saying and make the voiceover shorter than the video.
+
+Be sure to only include the actual spoken content and not any other text that isn't meant to actually be said.
+"""
+
+
+def generate_voiceover_from_manim_code(manim_code: str, output_dir="outputs", filename=None):
     """
     Generates a spoken narration for a Manim script and saves it as an MP3 file.
     """
-    client = openai.OpenAI(api_key=os.environ["OPENAI_API_KEY"])
-    os.makedirs(output_dir, exist_ok=True)
+    return narrate_manim_code(manim_code, output_dir, filename)[0]
 
-    # prompt for generating voiceover text
-    prompt = f"""
-    You are an educational narrator. Based on the following Manim Python code, 
-    write a clear, very concise spoken explanation (the manim animations will do most of the explaining) that could accompany 
-    the animation for a math learner. Make it sound like a teacher explaining a concept. 
-    Get the timing correct in what you're saying and make the voiceover shorter than the video.
 
-    Be sure to only include the actual spoken content and not any other text that isn't meant to actually be said.
+def narration_messages(manim_code: str):
+    return [
+        {"role": "system", "content": NARRATION_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Manim Code:\n```\n{manim_code}\n```"},
+    ]
 
-    Manim Code:
-    ```
-    {manim_code}
-    ```
+
+def synthesize_speech(text: str, output_path: str) -> str:
+    """TTS for text, written to output_path (mp3)."""
+
+    def synthesize():
+        with client.audio.speech.with_streaming_response.create(
+            model="gpt-4o-mini-tts",
+            voice="alloy",
+            input=text,
+            timeout=openai_client.timeout_for("tts"),
+        ) as response:
+            response.stream_to_file(output_path)
+
+    # not hedged: both attempts would write the same file
+    openai_client.call("tts", synthesize, hedge=False)
+    return output_path
+
+
+SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+
+
+def split_sentences(buffer: str, min_chars: int = MIN_TTS_CHARS):
+    """
+    (complete sentences, unfinished rest) of streamed text. Sentences shorter than
+    min_chars are joined to the one after them.
     """
+    sentences = []
+    start = 0
+    for match in SENTENCE_END.finditer(buffer):
+        if match.end() - start >= min_chars:
+            sentences.append(buffer[start:match.end()].strip())
+            start = match.end()
+    return sentences, buffer[start:]
+
+
+def narrate_manim_code(manim_code: str, output_dir="outputs", filename=None):
+    """
+    generate_voiceover_from_manim_code, also returning the narration text:
+    (mp3 path, narration_text).
+    Without a filename each call writes its own voiceover_<uuid>.mp3, so concurrent jobs
+    never share an audio file.
+    """
+    filename = filename or f"voiceover_{uuid.uuid4().hex}.mp3"
+    if STREAM_NARRATION:
+        return stream_narration(manim_code, output_dir, filename)
+
+    os.makedirs(output_dir, exist_ok=True)
 
     print("🧠 Generating narration text...")
-    narration_response = client.chat.completions.create(
+    narration_text = cached_chat_completion(
+        client,
         model="gpt-4.1",
-        messages=[{"role": "user", "content": prompt}],
+        messages=narration_messages(manim_code),
         temperature=0.2,
         max_tokens=200,
-    )
-
-    narration_text = narration_response.choices[0].message.content.strip()
+        label="narration",
+    ).strip()
     print(f"🗣️ Narration text: {narration_text}")
 
     # generating tts audio
     output_path = os.path.join(output_dir, filename)
 
     print("🎧 Generating voiceover MP3...")
-    with client.audio.speech.with_streaming_response.create(
-        model="gpt-4o-mini-tts",
-        voice="alloy",
-        input=narration_text,
-    ) as response:
-        response.stream_to_file(output_path)
+    synthesize_speech(narration_text, output_path)
 
     print(f"✅ Saved voiceover: {output_path}")
-    return output_path
+    return output_path, narration_text
+
+
+def remove_chunks(futures):
+    """Delete the clips that synthesize_speech futures managed to write."""
+    for future in futures:
+        if not future.exception() and os.path.exists(future.result()):
+            os.remove(future.result())
+
+
+def stream_narration(manim_code: str, output_dir="outputs", filename=None):
+    """
+    narrate_manim_code with the narration streamed: each sentence goes to TTS as soon as
+    it's complete, the clips synthesize concurrently, and are joined in order at the end.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, filename or f"voiceover_{uuid.uuid4().hex}.mp3")
+    chunk_prefix = os.path.join(output_dir, f"tts_{uuid.uuid4().hex}")
+
+    print("🧠 Streaming narration text...")
+    start_time = time.perf_counter()
+    narration_text = ""
+    buffer = ""
+    futures = []
+    try:
+        with ThreadPoolExecutor(max_workers=TTS_WORKERS) as executor:
+
+            def submit(sentence):
+                chunk_path = f"{chunk_prefix}_{len(futures):03d}.mp3"
+                futures.append(executor.submit(synthesize_speech, sentence, chunk_path))
+
+            for delta in cached_stream_chat_completion(
+                client,
+                model="gpt-4.1",
+                messages=narration_messages(manim_code),
+                temperature=0.2,
+                max_tokens=200,
+                label="narration",
+            ):
+                narration_text += delta
+                buffer += delta
+                sentences, buffer = split_sentences(buffer)
+                for sentence in sentences:
+                    if not futures:
+                        print(f"🎧 First sentence to TTS after {time.perf_counter() - start_time:.2f}s")
+                    submit(sentence)
+            if buffer.strip():
+                submit(buffer.strip())
+    except BaseException:
+        # the narration stream broke off; leaving the executor waited for the clips already sent
+        remove_chunks(futures)
+        raise
+
+    failed = [future.exception() for future in futures if future.exception()]
+    if failed:
+        remove_chunks(futures)
+        raise failed[0]
+    chunks = [future.result() for future in futures]
+
+    narration_text = narration_text.strip()
+    print(f"🗣️ Narration text: {narration_text}")
+    if not chunks:
+        raise Exception("Narration came back empty.")
+
+    if len(chunks) == 1:
+        os.replace(chunks[0], output_path)
+    else:
+        try:
+            concat_audio(chunks, output_path)
+        finally:
+            remove_chunks(futures)
+
+    print(f"✅ Saved voiceover ({len(chunks)} clips, {time.perf_counter() - start_time:.2f}s): {output_path}")
+    return output_path, narration_text
+
+
+
+
+class PipelineResult:
+    """What one pipeline run produced: the media files, the code and command that rendered, and the narration."""
 
+    def __init__(self, video_path, audio_path, manim_code=None, manim_command=None, narration_text=None):
+        self.video_path = video_path
+        self.audio_path = audio_path
+        self.manim_code = manim_code
+        self.manim_command = manim_command
+        self.narration_text = narration_text
 
 
+def mux_outputs(video_path, voiceover_file):
+    """
+    Post-processing after render + voiceover. Returns (video_path, voiceover_file);
+    voiceover_file is None once the audio lives inside the video.
+    """
+    if not (MUX_AUDIO and video_path and voiceover_file):
+        return video_path, voiceover_file
+
+    start_time = time.perf_counter()
+    muxed_path = mux_audio_video(video_path, voiceover_file)
+    print("ELAPSED TIME MUX:", time.perf_counter() - start_time)
+    if muxed_path is None:
+        return video_path, voiceover_file
+    return muxed_path, None
+
+
+class PipelineCancelled(Exception):
+    pass
+
+
+def _check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise PipelineCancelled("Pipeline cancelled.")
+
+
+def start_narration(executor, manim_code):
+    """
+    Submits narration for manim_code as the validator will auto-fix it, which is the code
+    that renders unless a repair is needed. Returns (future, narrated code).
+    """
+    report = validate_manim_code(manim_code)
+    if report.ok:
+        manim_code = report.code
+    return executor.submit(narrate_manim_code, manim_code), manim_code
+
+
+def finish_narration(future_audio, narrated_code, rendered_code):
+    """
+    (mp3 path, narration_text) from start_narration's future. When the render needed a
+    repair, that narration describes code that never rendered, so it's redone for the
+    code that did.
+    """
+    voiceover_file, narration_text = future_audio.result()
+    if rendered_code is None or rendered_code == narrated_code:
+        return voiceover_file, narration_text
+
+    print("🔁 Rendered code differs from the narrated code; narrating again...")
+    os.remove(voiceover_file)
+    return narrate_manim_code(rendered_code)
+
 
-def pipeline(user_query):
+def open_hls_stream(progress):
+    """
+    A live HLS stream for this render (when enabled), announced through progress.
+    A repair attempt's new stream replaces the failed one's URL. Section renders run as
+    separate processes, so they are never streamed.
+    """
+    if not HLS_STREAMING or PARALLEL_SECTIONS:
+        return None
+    delete_expired_streams()
+    stream = HlsStream()
+    if progress is not None:
+        progress["stream_url"] = stream.url
+    return stream
+
+
+def pipeline(user_query, cancel_event=None, progress=None):
+    """
+    Runs generation, render and voiceover for one query.
+    Returns a PipelineResult; its audio_path is None when the audio was muxed into the video.
+    cancel_event (threading.Event) is checked between stages so a cancelled job stops early.
+    progress (dict) receives intermediate results such as the live stream URL.
+    """
     # keywords = get_keywords(user_query)
+    _check_cancelled(cancel_event)
+    if STREAM_GENERATION:
+        return streaming_pipeline(user_query, cancel_event, progress)
+
     start_time = time.perf_counter()
-    response = generate_manim_code(user_query)
+    messages = build_manim_messages(user_query)
+    response = request_manim_code(messages)
     end_time = time.perf_counter()
 
+    print("manim code:", response)
     print("ELAPSED TIME GENERATION:" + str(end_time - start_time))
 
     manim_code = get_python_code(response)
-    manim_command = get_manim_command(response)
 
-    #parallelizing the voiceover and rendering.
+    _check_cancelled(cancel_event)
+
+    #parallelizing the voiceover and rendering (with repair on failure).
     start_time = time.perf_counter()
 
     with ThreadPoolExecutor(max_workers=2) as executor:
-        future_video = executor.submit(generate_manim_video, manim_code, manim_command)
-        future_audio = executor.submit(generate_voiceover_from_manim_code, manim_code)
+        future_video = executor.submit(
+            render_with_repair, messages, response,
+            cancel_event=cancel_event, progress=progress,
+        )
+        future_audio, narrated_code = start_narration(executor, manim_code)
 
         # Wait for both to finish
-        video_path = future_video.result()
-        voiceover_file = future_audio.result()
+        video_path, manim_code, manim_command = future_video.result()
+        voiceover_file, narration_text = finish_narration(future_audio, narrated_code, manim_code)
 
     end_time = time.perf_counter()
     print("ELAPSED TIME PARALLEL RENDER + VO:", end_time - start_time)
 
-    return video_path, voiceover_file
+    _check_cancelled(cancel_event)
 
+    video_path, voiceover_file = mux_outputs(video_path, voiceover_file)
+    return PipelineResult(video_path, voiceover_file, manim_code, manim_command, narration_text)
 
 
 
+
+def streaming_pipeline(user_query, cancel_event=None, progress=None):
+    """
+    pipeline() with a streamed completion: render and voiceover are submitted the moment
+    the ```python fence closes, while the rest of the response is still streaming.
+    """
+    start_time = time.perf_counter()
+    messages = build_manim_messages(user_query)
+    response = ""
+    future_video = None
+    future_audio = None
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for delta in stream_manim_code(user_query):
+            _check_cancelled(cancel_event)
+            response += delta
+            if future_video is not None:
+                continue
+
+            manim_code = get_closed_python_code(response)
+            if manim_code is None:
+                continue
+
+            print("ELAPSED TIME TO CODE BLOCK:", time.perf_counter() - start_time)
+            future_video = executor.submit(
+                render_with_repair, messages, response,
+                cancel_event=cancel_event, progress=progress,
+            )
+            future_audio, narrated_code = start_narration(executor, manim_code)
+
+        print("ELAPSED TIME GENERATION:" + str(time.perf_counter() - start_time))
+        print("manim code:", response)
+
+        if future_video is None:
+            # never saw a closed fence (e.g. truncated output) -> continue it, then render
+            response = complete_manim_response(messages, response)
+            manim_code = get_python_code(response)
+            future_video = executor.submit(
+                render_with_repair, messages, response,
+                cancel_event=cancel_event, progress=progress,
+            )
+            future_audio, narrated_code = start_narration(executor, manim_code)
+
+        video_path, manim_code, manim_command = future_video.result()
+        voiceover_file, narration_text = finish_narration(future_audio, narrated_code, manim_code)
+
+    print("ELAPSED TIME STREAMED GENERATION + RENDER + VO:", time.perf_counter() - start_time)
+
+    _check_cancelled(cancel_event)
+
+    video_path, voiceover_file = mux_outputs(video_path, voiceover_file)
+    return PipelineResult(video_path, voiceover_file, manim_code, manim_command, narration_text)
+
+
 def main():
 
     prompt_input = input("What do you need help with?: ")
@@ -0,0 +1,112 @@
+# example_index.py
+import math
+import os
+import re
+from typing import Dict, List
+
+import numpy as np
+
+from manim_examples import EXAMPLES
+
+# Few-shot selection for the manim prompt: a TF-IDF index over each example's question,
+# tags and scene name, built once at import. build_manim_messages asks for the examples
+# closest to the user's query, as many as fit in FEWSHOT_TOKEN_BUDGET (at most FEWSHOT_K).
+FEWSHOT_K = int(os.environ.get("MATHINQ_FEWSHOT_K", "2"))
+FEWSHOT_TOKEN_BUDGET = int(os.environ.get("MATHINQ_FEWSHOT_TOKEN_BUDGET", "1500"))
+
+STOPWORDS = {
+    "a", "an", "and", "are", "at", "can", "do", "does", "explain", "find", "for", "help", "how", "i",
+    "in", "is", "it", "me", "my", "need", "of", "on", "show", "the", "through", "to",
+    "understand", "walk", "what", "with", "you", "don", "t",
+}
+WORD = re.compile(r"[a-z0-9]+")
+SCENE_NAME = re.compile(r"class\s+(\w+)\s*\(\s*\w*Scene\s*\)")
+
+
+def tokenize(text: str) -> List[str]:
+    # split CamelCase scene names, then a crude plural strip so "fractions" finds "fraction";
+    # bare numbers say nothing about the topic
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text).lower()
+    words = []
+    for word in WORD.findall(text):
+        if word in STOPWORDS or word.isdigit():
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return words
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English and code)."""
+    return math.ceil(len(text) / 4)
+
+
+def example_tokens(example: Dict[str, str]) -> int:
+    return estimate_tokens(example["user"]) + estimate_tokens(example["code"])
+
+
+class ExampleIndex:
+    """Cosine similarity over sublinear TF-IDF vectors of the examples' descriptions."""
+
+    def __init__(self, examples: List[Dict[str, str]]):
+        self.examples = examples
+        self.costs = [example_tokens(example) for example in examples]
+
+        docs = []
+        for example in examples:
+            scene_names = " ".join(SCENE_NAME.findall(example["code"]))
+            docs.append(tokenize(f"{example['user']} {example.get('tags', '')} {scene_names}"))
+
+        self.vocab = {word: i for i, word in enumerate(sorted({w for doc in docs for w in doc}))}
+        counts = np.zeros((len(docs), len(self.vocab)))
+        for row, doc in enumerate(docs):
+            for word in doc:
+                counts[row, self.vocab[word]] += 1
+
+        doc_freq = np.count_nonzero(counts, axis=0)
+        self.idf = np.log((1 + len(docs)) / (1 + doc_freq)) + 1
+        self.matrix = self._normalize(self._weigh(counts))
+
+    def _weigh(self, counts: np.ndarray) -> np.ndarray:
+        return np.where(counts > 0, 1 + np.log(np.maximum(counts, 1)), 0) * self.idf
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def scores(self, query: str) -> np.ndarray:
+        counts = np.zeros(len(self.vocab))
+        for word in tokenize(query):
+            if word in self.vocab:
+                counts[self.vocab[word]] += 1
+        return self.matrix @ self._normalize(self._weigh(counts))
+
+    def select(self, query: str, k: int = FEWSHOT_K, token_budget: int = FEWSHOT_TOKEN_BUDGET) -> List[Dict[str, str]]:
+        """
+        The most relevant examples for query that fit in token_budget together, returned in
+        library order so the same selection always produces the same prompt prefix.
+        With no word in common with any example, the library order is used for ranking too.
+        """
+        scores = self.scores(query)
+        if scores.max(initial=0) > 0:
+            order = [int(i) for i in np.argsort(-scores, kind="stable") if scores[i] > 0]
+        else:
+            order = list(range(len(self.examples)))
+
+        chosen, used = [], 0
+        for i in order:
+            if len(chosen) >= k:
+                break
+            if used + self.costs[i] <= token_budget:
+                chosen.append(i)
+                used += self.costs[i]
+        return [self.examples[i] for i in sorted(chosen)]
+
+
+index = ExampleIndex(EXAMPLES)
+
+
+def select_examples(query: str) -> List[Dict[str, str]]:
+    return index.select(query)
@@ -0,0 +1,129 @@
+# ffmpeg_utils.py
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+
+def ffmpeg_exe() -> str:
+    """MATHINQ_FFMPEG, else the binary bundled with imageio-ffmpeg, else ffmpeg on PATH."""
+    configured = os.environ.get("MATHINQ_FFMPEG")
+    if configured:
+        return configured
+    try:
+        import imageio_ffmpeg
+
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except (ImportError, RuntimeError):
+        return shutil.which("ffmpeg") or "ffmpeg"
+
+
+def run_ffmpeg(args: List[str]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [ffmpeg_exe(), "-hide_banner", "-loglevel", "error", "-y", *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+
+def probe_duration(path: str) -> float:
+    """Duration in seconds from ffmpeg's stream info (0.0 if it can't be read)."""
+    proc = subprocess.run([ffmpeg_exe(), "-hide_banner", "-i", path], capture_output=True, text=True)
+    match = re.search(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)", proc.stderr)
+    if not match:
+        return 0.0
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def mux_audio_video(video_path: str, audio_path: str, output_path: Optional[str] = None) -> Optional[str]:
+    """
+    Put the narration into the video: the video stream is copied as-is, the MP3 becomes AAC,
+    and the moov atom is moved to the front so playback can start while downloading.
+    Removes the two inputs on success. Returns the muxed path, or None if ffmpeg failed.
+    """
+    if output_path is None:
+        output_path = str(Path(video_path).with_name(Path(video_path).stem + "_muxed.mp4"))
+
+    try:
+        run_ffmpeg([
+            "-i", video_path,
+            "-i", audio_path,
+            "-map", "0:v:0",
+            "-map", "1:a:0",
+            "-c:v", "copy",
+            "-c:a", "aac",
+            "-movflags", "+faststart",
+            output_path,
+        ])
+    except (subprocess.CalledProcessError, OSError) as e:
+        print("❌ Audio/video mux failed:")
+        print(getattr(e, "stderr", None) or e)
+        return None
+
+    os.remove(video_path)
+    os.remove(audio_path)
+    print(f"✅ Muxed video saved to: {output_path}")
+    return output_path
+
+
+def replace_video_stream(video_path: str, audio_source: str, output_path: str) -> Optional[str]:
+    """
+    Pair video_path's picture with audio_source's audio track (if it has one), all stream copy,
+    with faststart. Returns output_path, or None if ffmpeg failed.
+    """
+    try:
+        run_ffmpeg([
+            "-i", video_path,
+            "-i", audio_source,
+            "-map", "0:v:0",
+            "-map", "1:a:0?",
+            "-c", "copy",
+            "-movflags", "+faststart",
+            output_path,
+        ])
+    except (subprocess.CalledProcessError, OSError) as e:
+        print("❌ Video replace failed:")
+        print(getattr(e, "stderr", None) or e)
+        return None
+    return output_path
+
+
+def concat_videos(paths: List[str], output_path: str) -> str:
+    """
+    Join mp4s that share codec settings with the concat demuxer (stream copy, no re-encode).
+    Raises subprocess.CalledProcessError if ffmpeg fails.
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as list_file:
+        for path in paths:
+            escaped = str(Path(path).resolve()).replace("'", "'\\''")
+            list_file.write(f"file '{escaped}'\n")
+    try:
+        run_ffmpeg([
+            "-f", "concat",
+            "-safe", "0",
+            "-i", list_file.name,
+            "-c", "copy",
+            "-movflags", "+faststart",
+            output_path,
+        ])
+    finally:
+        os.remove(list_file.name)
+    return output_path
+
+
+def concat_audio(paths: List[str], output_path: str) -> str:
+    """Join audio clips in order into one mp3 with pydub (decoded and re-encoded via our ffmpeg)."""
+    # imported here so pydub picks up our ffmpeg rather than searching PATH at import
+    from pydub import AudioSegment
+
+    AudioSegment.converter = ffmpeg_exe()
+    combined = AudioSegment.empty()
+    for path in paths:
+        combined += AudioSegment.from_file(path)
+    combined.export(output_path, format="mp3")
+    return output_path
@@ -0,0 +1,162 @@
+# hls_stream.py
+import os
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ffmpeg_utils import probe_duration, run_ffmpeg
+
+# Live HLS playlists built from manim's partial movie files while a render is still running
+HLS_DIR = Path(os.environ.get("MATHINQ_HLS_DIR", "outputs/hls"))
+HLS_TARGET_DURATION = int(os.environ.get("MATHINQ_HLS_TARGET_DURATION", "10"))
+POLL_SECONDS = 0.25
+# streams are only for watching a render live; the finished video replaces them
+HLS_TTL_SECONDS = float(os.environ.get("MATHINQ_HLS_TTL", "3600"))
+
+
+class HlsStream:
+    """
+    An EVENT playlist under HLS_DIR/<id>/index.m3u8. Each partial movie file is remuxed
+    (no re-encode) into one MPEG-TS segment, offset so timestamps run on continuously.
+    EVENT playlists only ever grow, so a retried render gets a new stream, not this one.
+    """
+
+    def __init__(self, stream_id: Optional[str] = None):
+        self.id = stream_id or str(uuid.uuid4())
+        self.dir = HLS_DIR / self.id
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.segments: List[Tuple[str, float]] = []
+        self.offset = 0.0
+        self.finished = False
+        self._lock = threading.Lock()
+        self._write_playlist()
+
+    @property
+    def url(self) -> str:
+        return f"/stream/{self.id}/index.m3u8"
+
+    def add_partial(self, partial_path: Path) -> None:
+        with self._lock:
+            name = f"seg_{len(self.segments):05d}.ts"
+            try:
+                run_ffmpeg([
+                    "-i", str(partial_path),
+                    "-c", "copy",
+                    "-bsf:v", "h264_mp4toannexb",
+                    "-output_ts_offset", f"{self.offset:.3f}",
+                    "-f", "mpegts",
+                    str(self.dir / name),
+                ])
+            except (subprocess.CalledProcessError, OSError) as e:
+                print(f"⚠️ Could not segment {partial_path.name}: {getattr(e, 'stderr', None) or e}")
+                return
+
+            duration = probe_duration(str(partial_path))
+            self.segments.append((name, duration))
+            self.offset += duration
+            self._write_playlist()
+
+    def finish(self) -> None:
+        with self._lock:
+            self.finished = True
+            self._write_playlist()
+
+    def _write_playlist(self) -> None:
+        target = max([HLS_TARGET_DURATION] + [int(d + 0.999) for _, d in self.segments])
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            "#EXT-X-PLAYLIST-TYPE:EVENT",
+            f"#EXT-X-TARGETDURATION:{target}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+        ]
+        for name, duration in self.segments:
+            lines.append(f"#EXTINF:{duration:.3f},")
+            lines.append(name)
+        if self.finished:
+            lines.append("#EXT-X-ENDLIST")
+
+        # atomic replace so a polling player never reads half a playlist
+        tmp_path = self.dir / "index.m3u8.tmp"
+        tmp_path.write_text("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.dir / "index.m3u8")
+
+    def delete(self) -> None:
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+def delete_expired_streams(ttl: float = HLS_TTL_SECONDS) -> None:
+    """Remove stream directories under HLS_DIR untouched for more than ttl seconds."""
+    if not HLS_DIR.exists():
+        return
+    cutoff = time.time() - ttl
+    for stream_dir in HLS_DIR.iterdir():
+        try:
+            expired = stream_dir.is_dir() and stream_dir.stat().st_mtime < cutoff
+        except FileNotFoundError:
+            continue
+        if expired:
+            shutil.rmtree(stream_dir, ignore_errors=True)
+
+
+class PartialMovieWatcher(threading.Thread):
+    """
+    Polls a render's partial_movie_files directory. A partial file is complete once a
+    newer one appears (manim has moved on to the next play()), or when the render ends.
+    """
+
+    def __init__(self, partial_dir: Path, stream: HlsStream):
+        super().__init__(daemon=True)
+        self.partial_dir = partial_dir
+        self.stream = stream
+        self._stop_event = threading.Event()
+        self._seen: Dict[Path, int] = {}
+        self._published = 0
+
+    def run(self) -> None:
+        while not self._stop_event.wait(POLL_SECONDS):
+            self._poll(final=False)
+
+    def stop(self, publish_remaining: bool) -> None:
+        self._stop_event.set()
+        self.join()
+        if publish_remaining:
+            self._poll(final=True)
+
+    def _poll(self, final: bool) -> None:
+        if not self.partial_dir.exists():
+            return
+        new = [p for p in self.partial_dir.rglob("*.mp4") if p not in self._seen]
+        for path in sorted(new, key=lambda p: p.stat().st_mtime):
+            self._seen[path] = len(self._seen)
+
+        ordered = sorted(self._seen, key=self._seen.get)
+        complete = ordered if final else ordered[:-1]
+        for path in complete[self._published:]:
+            self.stream.add_partial(path)
+            self._published += 1
+
+
+@contextmanager
+def stream_partials(partial_dir: Path, stream: Optional[HlsStream]):
+    """Publish partial movie files to stream while the body (the render) runs."""
+    if stream is None:
+        yield
+        return
+
+    watcher = PartialMovieWatcher(partial_dir, stream)
+    watcher.start()
+    try:
+        yield
+    except BaseException:
+        # keep what was already published (players may have it) and end the playlist
+        watcher.stop(publish_remaining=False)
+        stream.finish()
+        raise
+    watcher.stop(publish_remaining=True)
+    stream.finish()
@@ -0,0 +1,161 @@
+# jobs.py
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# How many pipelines may run at once, and how many finished jobs we remember
+PIPELINE_WORKERS = int(os.environ.get("MATHINQ_PIPELINE_WORKERS", "2"))
+JOB_HISTORY = int(os.environ.get("MATHINQ_JOB_HISTORY", "500"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class Job:
+    """One queued call of the job function and everything we know about it."""
+
+    def __init__(self, args: tuple, kwargs: Dict[str, Any]):
+        self.id = str(uuid.uuid4())
+        self.args = args
+        self.kwargs = kwargs
+        self.status = QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_event = threading.Event()
+        # filled in by the job function while it runs (e.g. a live stream URL)
+        self.progress: Dict[str, Any] = {}
+        self.future = None
+        # result changes that arrive after the job function returned (see update_result)
+        self._updates: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def set_result(self, result: Any) -> None:
+        with self._lock:
+            if isinstance(result, dict) and self._updates:
+                result = {**result, **self._updates}
+            self.result = result
+
+    def update_result(self, **changes: Any) -> None:
+        """
+        Change keys of a dict result after the job has returned it. The served dict is
+        never mutated: a new one replaces it, so a concurrent to_dict() sees old or new.
+        """
+        with self._lock:
+            self._updates.update(changes)
+            if isinstance(self.result, dict):
+                self.result = {**self.result, **changes}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "progress": dict(self.progress),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """
+    Runs fn(*args, cancel_event=..., progress=..., update_result=..., **kwargs) on a bounded
+    pool of worker threads. submit() returns immediately; callers poll get() for status and result.
+    update_result(**changes) lets work the job leaves running (e.g. a quality upgrade)
+    change its result later.
+    """
+
+    def __init__(self, fn: Callable[..., Any], max_workers: int = PIPELINE_WORKERS,
+                 history: int = JOB_HISTORY):
+        self.fn = fn
+        self.history = history
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline")
+
+    def submit(self, *args, **kwargs) -> Job:
+        job = Job(args, kwargs)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a job. Queued jobs never start; running jobs are asked to stop
+        via their cancel_event and finish as cancelled at the next checkpoint.
+        """
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return job
+
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            self._finish(job, CANCELLED)
+        return job
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            if job.status == QUEUED:
+                self.cancel(job.id)
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job: Job) -> None:
+        if job.cancel_event.is_set():
+            self._finish(job, CANCELLED)
+            return
+
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            result = self.fn(*job.args, cancel_event=job.cancel_event, progress=job.progress,
+                             update_result=job.update_result, **job.kwargs)
+        except Exception as e:
+            if job.cancel_event.is_set():
+                self._finish(job, CANCELLED)
+            else:
+                self._finish(job, FAILED, error=str(e))
+            return
+
+        if job.cancel_event.is_set():
+            self._finish(job, CANCELLED)
+        else:
+            self._finish(job, DONE, result=result)
+
+    def _finish(self, job: Job, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        job.set_result(result)
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+
+    def _prune(self) -> None:
+        # drop the oldest finished jobs once we remember more than `history`
+        excess = len(self._jobs) - self.history
+        if excess <= 0:
+            return
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].status in FINISHED_STATES:
+                del self._jobs[job_id]
+                excess -= 1
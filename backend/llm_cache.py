@@ -0,0 +1,218 @@
+# llm_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import llm_usage
+import openai_client
+
+# Completions keyed by (model, messages, temperature, max_tokens)
+CACHE_DB_PATH = Path(os.environ.get("MATHINQ_LLM_CACHE_DB", "llm_cache.db"))
+CACHE_ENABLED = os.environ.get("MATHINQ_LLM_CACHE", "1") != "0"
+CACHE_TTL_SECONDS = float(os.environ.get("MATHINQ_LLM_CACHE_TTL", str(7 * 24 * 3600)))
+CACHE_MAX_ENTRIES = int(os.environ.get("MATHINQ_LLM_CACHE_MAX_ENTRIES", "10000"))
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def _get_connection():
+    conn = sqlite3.connect(CACHE_DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def init_cache() -> None:
+    """Create the cache table if it doesn't exist."""
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        conn = _get_connection()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(completions)")}
+        if "finish_reason" not in columns:
+            conn.execute("ALTER TABLE completions ADD COLUMN finish_reason TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_last_used ON completions(last_used)")
+        conn.commit()
+        conn.close()
+        _initialized = True
+
+
+def cache_key(model: str, messages: List[Dict[str, Any]], temperature: float, max_tokens: int) -> str:
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _bump(name: str, n: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += n
+
+
+def get(key: str) -> Optional[Tuple[str, Optional[str]]]:
+    """Return (completion text, finish_reason), or None on a miss / expired entry."""
+    init_cache()
+    now = time.time()
+    conn = _get_connection()
+    row = conn.execute(
+        "SELECT content, finish_reason, created_at FROM completions WHERE key = ?", (key,)
+    ).fetchone()
+
+    if row is None or now - row["created_at"] > CACHE_TTL_SECONDS:
+        if row is not None:
+            conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            conn.commit()
+        conn.close()
+        _bump("misses")
+        return None
+
+    conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+    conn.commit()
+    conn.close()
+    _bump("hits")
+    return row["content"], row["finish_reason"]
+
+
+def put(key: str, model: str, content: str, finish_reason: Optional[str] = None) -> None:
+    """Store a completion and evict least-recently-used entries past CACHE_MAX_ENTRIES."""
+    init_cache()
+    now = time.time()
+    conn = _get_connection()
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO completions (key, model, content, finish_reason, created_at, last_used)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (key, model, content, finish_reason, now, now),
+    )
+    cur = conn.execute(
+        """
+        DELETE FROM completions WHERE key IN (
+            SELECT key FROM completions ORDER BY last_used DESC LIMIT -1 OFFSET ?
+        )
+        """,
+        (CACHE_MAX_ENTRIES,),
+    )
+    conn.commit()
+    conn.close()
+    if cur.rowcount > 0:
+        _bump("evictions", cur.rowcount)
+
+
+def cached_chat_completion_with_reason(client, model: str, messages: List[Dict[str, Any]],
+                                       temperature: float, max_tokens: int,
+                                       label: str = "chat") -> Tuple[str, Optional[str]]:
+    """
+    client.chat.completions.create(...) that returns (message text, finish_reason),
+    served from the on-disk cache when the exact same request was made before.
+    label names the call type in llm_usage stats.
+    """
+    key = cache_key(model, messages, temperature, max_tokens)
+    if CACHE_ENABLED:
+        cached = get(key)
+        if cached is not None:
+            print("✅ LLM cache hit.")
+            llm_usage.record_cache_hit(label)
+            return cached
+
+    start = time.perf_counter()
+    response = openai_client.chat_completion(
+        client,
+        label,
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+    )
+    llm_usage.record(label, response.usage, time.perf_counter() - start)
+    content = response.choices[0].message.content
+    finish_reason = response.choices[0].finish_reason
+
+    if CACHE_ENABLED and content:
+        put(key, model, content, finish_reason)
+    return content, finish_reason
+
+
+def cached_chat_completion(client, model: str, messages: List[Dict[str, Any]],
+                           temperature: float, max_tokens: int, label: str = "chat") -> str:
+    """cached_chat_completion_with_reason, returning only the message text."""
+    content, _ = cached_chat_completion_with_reason(client, model, messages, temperature, max_tokens, label)
+    return content
+
+
+def cached_stream_chat_completion(client, model: str, messages: List[Dict[str, Any]],
+                                  temperature: float, max_tokens: int, label: str = "chat") -> Iterator[str]:
+    """
+    Streaming version of cached_chat_completion: yields text deltas as they arrive.
+    A cache hit yields the whole stored completion at once; a miss is stored once the stream ends.
+    """
+    key = cache_key(model, messages, temperature, max_tokens)
+    if CACHE_ENABLED:
+        cached = get(key)
+        if cached is not None:
+            print("✅ LLM cache hit.")
+            llm_usage.record_cache_hit(label)
+            yield cached[0]
+            return
+
+    start = time.perf_counter()
+    stream = openai_client.chat_completion(
+        client,
+        label,
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True,
+        # the last chunk then carries the usage (with no choices)
+        stream_options={"include_usage": True},
+    )
+    chunks = []
+    finish_reason = None
+    usage = None
+    first_token = None
+    for chunk in stream:
+        usage = getattr(chunk, "usage", None) or usage
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        finish_reason = chunk.choices[0].finish_reason or finish_reason
+        if delta:
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            chunks.append(delta)
+            yield delta
+    llm_usage.record(label, usage, time.perf_counter() - start, first_token)
+
+    content = "".join(chunks)
+    if CACHE_ENABLED and content:
+        put(key, model, content, finish_reason)
+
+
+def stats() -> Dict[str, Any]:
+    with _stats_lock:
+        out = dict(_stats)
+    lookups = out["hits"] + out["misses"]
+    out["hit_rate"] = out["hits"] / lookups if lookups else 0.0
+    return out
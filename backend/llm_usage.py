@@ -0,0 +1,58 @@
+# llm_usage.py
+import threading
+from typing import Any, Dict, Optional
+
+# Per-call-type token and latency totals, read off each response's `usage` field.
+# cached_tokens is the part of the prompt the provider served from its prefix cache;
+# its share of prompt_tokens shows whether our prompts keep a stable prefix.
+
+_lock = threading.Lock()
+_totals: Dict[str, Dict[str, float]] = {}
+
+
+def _empty() -> Dict[str, float]:
+    return {"calls": 0, "cache_hits": 0, "prompt_tokens": 0, "completion_tokens": 0,
+            "cached_tokens": 0, "latency_seconds": 0.0, "first_token_seconds": 0.0, "streamed": 0}
+
+
+def record(label: str, usage: Any, latency: float, first_token: Optional[float] = None) -> None:
+    """Add one API call. usage is the response's usage object (may be None)."""
+    prompt = getattr(usage, "prompt_tokens", 0) or 0
+    completion = getattr(usage, "completion_tokens", 0) or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) or 0
+
+    with _lock:
+        totals = _totals.setdefault(label, _empty())
+        totals["calls"] += 1
+        totals["prompt_tokens"] += prompt
+        totals["completion_tokens"] += completion
+        totals["cached_tokens"] += cached
+        totals["latency_seconds"] += latency
+        if first_token is not None:
+            totals["streamed"] += 1
+            totals["first_token_seconds"] += first_token
+
+    share = f" ({cached / prompt:.0%} cached)" if prompt else ""
+    ttft = f", first token {first_token:.2f}s" if first_token is not None else ""
+    print(f"📊 {label}: {prompt} prompt tokens{share}, {completion} completion tokens, {latency:.2f}s{ttft}")
+
+
+def record_cache_hit(label: str) -> None:
+    """A call answered by llm_cache without reaching the API."""
+    with _lock:
+        _totals.setdefault(label, _empty())["cache_hits"] += 1
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    with _lock:
+        out = {label: dict(totals) for label, totals in _totals.items()}
+    for totals in out.values():
+        calls = totals["calls"]
+        totals["cached_token_share"] = (
+            totals["cached_tokens"] / totals["prompt_tokens"] if totals["prompt_tokens"] else 0.0
+        )
+        totals["mean_latency_seconds"] = totals["latency_seconds"] / calls if calls else 0.0
+        streamed = totals.pop("streamed")
+        totals["mean_first_token_seconds"] = totals.pop("first_token_seconds") / streamed if streamed else None
+    return out
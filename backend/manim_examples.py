@@ -2,6 +2,7 @@
 
 # Put each example here as a dict.
 # "user"  = your question / problem
+# "tags"  = extra words the example index matches on (topics, synonyms)
 # "code"  = the Manim CE code you want as the answer
 
 # These are examples of very good code generations given a prompt. These examples avoid many of the common pitfalls of generated
@@ -10,80 +11,10 @@
 EXAMPLES = [
     {
         "user": "I need help with systems of linear equations.",
-        "code": """
+        "tags": "algebra linear system simultaneous equations intersection lines graph solve two variables",
+        "code": r"""
 from manim import *
-
-class LayoutManager:
-   def __init__(self, scene, margin_ratio=0.07):
-       self.scene = scene
-       self.margin_ratio = margin_ratio
-
-
-       fw = scene.camera.frame_width
-       fh = scene.camera.frame_height
-      
-       self.left   = -fw/2  + fw*margin_ratio
-       self.right  =  fw/2  - fw*margin_ratio
-       self.top    =  fh/2  - fh*margin_ratio
-       self.bottom = -fh/2  + fh*margin_ratio
-
-
-   # Pull object inside safe zone
-   def _pull_inside(self, mobj):
-       xmin, xmax = mobj.get_left()[0], mobj.get_right()[0]
-       ymin, ymax = mobj.get_bottom()[1], mobj.get_top()[1]
-
-
-       dx = 0
-       dy = 0
-
-
-       if xmin < self.left:
-           dx = self.left - xmin
-       if xmax > self.right:
-           dx = self.right - xmax
-       if ymin < self.bottom:
-           dy = self.bottom - ymin
-       if ymax > self.top:
-           dy = self.top - ymax
-
-
-       mobj.shift([dx, dy, 0])
-       return mobj
-
-
-   # Autoscale to safe width ratio
-   def autoscale(self, mobj, max_ratio=0.40):
-       fw = self.scene.camera.frame_width
-       if mobj.width > fw * max_ratio:
-           mobj.scale_to_fit_width(fw * max_ratio)
-       return mobj
-
-
-   # Helper placement functions
-   def place_top_left(self, mobj):
-       mobj.to_corner(UL)
-       return self._pull_inside(mobj)
-
-
-   def place_top_right(self, mobj):
-       mobj.to_corner(UR)
-       return self._pull_inside(mobj)
-
-
-   def place_bottom_left(self, mobj):
-       mobj.to_corner(DL)
-       return self._pull_inside(mobj)
-
-
-   def place_bottom_right(self, mobj):
-       mobj.to_corner(DR)
-       return self._pull_inside(mobj)
-
-
-   def place_center(self, mobj):
-       mobj.move_to(ORIGIN)
-       return self._pull_inside(mobj)
+from mathinq_layout import LayoutManager
 
 
 # ============================================================
@@ -131,7 +62,7 @@ class SystemsOfLinearEquations(Scene):
            axis_config={"include_numbers": True},
        )
        axes.to_edge(RIGHT).shift(DOWN * 0.3)
-       layout._pull_inside(axes)
+       layout.pull_inside(axes)
 
 
        self.play(Create(axes))
@@ -170,7 +101,7 @@ class SystemsOfLinearEquations(Scene):
 
 
        layout.autoscale(dot_label, max_ratio=0.25)
-       layout._pull_inside(dot_label)
+       layout.pull_inside(dot_label)
 
 
        self.play(FadeIn(dot), FadeIn(dot_label))
@@ -181,67 +112,10 @@ class SystemsOfLinearEquations(Scene):
 
     {
         "user": "I don't understand the quadratic formula",
-        "code": """
+        "tags": "algebra quadratic equation roots parabola discriminant x-intercepts factoring polynomial",
+        "code": r"""
 from manim import *
-
-
-# ============================================================
-# CLEAN, SAFE LAYOUT MANAGER (reduced overlap version)
-# ============================================================
-
-
-class LayoutManager:
-   def __init__(self, scene, margin_ratio=0.08):
-       self.scene = scene
-       fw = scene.camera.frame_width
-       fh = scene.camera.frame_height
-
-
-       self.margin_x = fw * margin_ratio
-       self.margin_y = fh * margin_ratio
-
-
-       self.left   = -fw/2  + self.margin_x
-       self.right  =  fw/2  - self.margin_x
-       self.top    =  fh/2  - self.margin_y
-       self.bottom = -fh/2  + self.margin_y
-
-
-   def autoscale(self, mobj, max_ratio=0.45):
-       fw = self.scene.camera.frame_width
-       if mobj.width > fw * max_ratio:
-           mobj.scale_to_fit_width(fw * max_ratio)
-       return mobj
-
-
-   def safe_position(self, mobj, pos):
-       mobj.move_to(pos)
-       return self._pull_inside(mobj)
-
-
-   def _pull_inside(self, mobj):
-       xmin, xmax = mobj.get_left()[0], mobj.get_right()[0]
-       ymin, ymax = mobj.get_bottom()[1], mobj.get_top()[1]
-
-
-       dx = 0
-       dy = 0
-
-
-       if xmin < self.left:
-           dx = self.left - xmin
-       if xmax > self.right:
-           dx = self.right - xmax
-       if ymin < self.bottom:
-           dy = self.bottom - ymin
-       if ymax > self.top:
-           dy = self.top - ymax
-
-
-       mobj.shift([dx, dy, 0])
-       return mobj
-
-
+from mathinq_layout import LayoutManager
 
 
 # ============================================================
@@ -287,7 +161,7 @@ class QuadraticFormulaScene(Scene):
        # Quadratic formula block (right side)
        # --------------------------------------------------------
        formula = MathTex(
-           rx = \frac\{-b \pm \sqrt{b^2 - 4ac}}{2a}, color=YELLOW)
+           r"x = \frac{-b \pm \sqrt{b^2 - 4ac}}{2a}", color=YELLOW)
        layout.autoscale(formula)
        layout.safe_position(formula, UP * 1.2 + RIGHT * 3.3)
 
@@ -356,8 +230,8 @@ class QuadraticFormulaScene(Scene):
        layout.autoscale(l2, max_ratio=0.18)
 
 
-       layout._pull_inside(l1)
-       layout._pull_inside(l2)
+       layout.pull_inside(l1)
+       layout.pull_inside(l2)
 
 
        self.play(FadeIn(d1), FadeIn(d2), FadeIn(l1), FadeIn(l2))
@@ -382,5 +256,282 @@ class QuadraticFormulaScene(Scene):
        self.play(FadeIn(final_note))
        self.wait(2)
 """
-    }
+    },
+
+    {
+        "user": "What is a derivative?",
+        "tags": "calculus derivative slope tangent line rate of change differentiation",
+        "code": r"""
+from manim import *
+from mathinq_layout import LayoutManager
+
+class DerivativeAsSlope(Scene):
+    def construct(self):
+        layout = LayoutManager(self)
+        title = layout.autoscale(Text("The Derivative Is a Slope", weight=BOLD), max_ratio=0.6)
+        layout.place_top_left(title)
+        self.play(FadeIn(title))
+
+        axes = Axes(x_range=[-1, 3, 1], y_range=[-1, 5, 1], x_length=5, y_length=4,
+                    axis_config={"include_numbers": True}).to_edge(LEFT).shift(DOWN * 0.5)
+        curve = axes.plot(lambda x: x**2, x_range=[-1, 2.2], color=BLUE)
+        curve_label = MathTex("f(x) = x^2", color=BLUE).next_to(axes, UP, buff=0.1)
+        self.play(Create(axes), Create(curve), FadeIn(curve_label))
+
+        dot = Dot(axes.c2p(1, 1), color=YELLOW)
+        tangent = axes.plot(lambda x: 2 * (x - 1) + 1, x_range=[-0.2, 2.4], color=YELLOW)
+        self.play(FadeIn(dot), Create(tangent))
+
+        steps = VGroup(
+            MathTex(r"f'(x) = 2x"),
+            MathTex(r"f'(1) = 2"),
+            Text("slope of the tangent at x = 1", font_size=28),
+        ).arrange(DOWN, aligned_edge=LEFT, buff=0.4)
+        layout.autoscale(steps, max_ratio=0.4)
+        layout.safe_position(steps, RIGHT * 3.5 + DOWN * 0.5)
+        for step in steps:
+            self.play(Write(step))
+        self.wait(2)
+"""
+    },
+
+    {
+        "user": "Explain the area under a curve and definite integrals",
+        "tags": "calculus integral definite integration area under curve riemann sum rectangles antiderivative",
+        "code": r"""
+from manim import *
+
+class AreaUnderCurve(Scene):
+    def construct(self):
+        title = Text("Area Under a Curve", weight=BOLD).scale_to_fit_width(6).to_edge(UP)
+        self.play(FadeIn(title))
+
+        axes = Axes(x_range=[0, 3, 1], y_range=[0, 5, 1], x_length=5, y_length=4,
+                    axis_config={"include_numbers": True}).to_edge(LEFT).shift(DOWN * 0.5)
+        graph = axes.plot(lambda x: 0.5 * x**2 + 1, x_range=[0, 2.8], color=BLUE)
+        self.play(Create(axes), Create(graph))
+
+        rects = axes.get_riemann_rectangles(graph, x_range=[0, 2], dx=0.25, fill_opacity=0.6)
+        self.play(Create(rects))
+        area = axes.get_area(graph, x_range=(0, 2), color=GREEN, opacity=0.6)
+        self.play(ReplacementTransform(rects, area))
+
+        integral = MathTex(r"\int_0^2 \left(\tfrac{1}{2}x^2 + 1\right)dx = \tfrac{10}{3}")
+        integral.scale_to_fit_width(5.5).to_edge(RIGHT)
+        note = Text("thinner rectangles approach the exact area", font_size=26)
+        note.scale_to_fit_width(5.5).next_to(integral, DOWN, buff=0.5)
+        self.play(Write(integral))
+        self.play(FadeIn(note))
+        self.wait(2)
+"""
+    },
+
+    {
+        "user": "Can you show me the Pythagorean theorem?",
+        "tags": "geometry pythagorean theorem right triangle hypotenuse legs squares a^2 + b^2 = c^2",
+        "code": r"""
+from manim import *
+
+class PythagoreanTheorem(Scene):
+    def construct(self):
+        title = Text("The Pythagorean Theorem", weight=BOLD).scale_to_fit_width(7).to_edge(UP)
+        self.play(FadeIn(title))
+
+        a, b = 1.5, 2.0
+        triangle = Polygon(ORIGIN, RIGHT * b, UP * a, color=WHITE)
+        sq_a = Square(a, color=BLUE, fill_opacity=0.4).next_to(Line(ORIGIN, UP * a), LEFT, buff=0)
+        sq_b = Square(b, color=RED, fill_opacity=0.4).next_to(Line(ORIGIN, RIGHT * b), DOWN, buff=0)
+        figure = VGroup(triangle, sq_a, sq_b).move_to(LEFT * 3 + DOWN * 0.5)
+        labels = VGroup(
+            MathTex("a", color=BLUE).move_to(sq_a),
+            MathTex("b", color=RED).move_to(sq_b),
+            MathTex("c").next_to(triangle.get_center(), UR, buff=0.1),
+        )
+        self.play(Create(triangle))
+        self.play(FadeIn(sq_a), FadeIn(sq_b), FadeIn(labels))
+
+        formula = MathTex("a^2", "+", "b^2", "=", "c^2").scale(1.3).move_to(RIGHT * 3)
+        formula[0].set_color(BLUE)
+        formula[2].set_color(RED)
+        example = MathTex("3^2 + 4^2 = 25 = 5^2").next_to(formula, DOWN, buff=0.6)
+        self.play(Write(formula))
+        self.play(FadeIn(example))
+        self.wait(2)
+"""
+    },
+
+    {
+        "user": "How do sine and cosine relate to the unit circle?",
+        "tags": "trigonometry trig unit circle sine cosine sin cos tan angle radians degrees coordinates",
+        "code": r"""
+from manim import *
+
+class UnitCircleTrig(Scene):
+    def construct(self):
+        title = Text("Sine and Cosine on the Unit Circle", weight=BOLD).scale_to_fit_width(8).to_edge(UP)
+        self.play(FadeIn(title))
+
+        plane = NumberPlane(x_range=[-1.5, 1.5, 1], y_range=[-1.5, 1.5, 1],
+                            x_length=4.5, y_length=4.5).to_edge(LEFT).shift(DOWN * 0.4)
+        circle = Circle(radius=plane.get_x_unit_size(), color=BLUE).move_to(plane.c2p(0, 0))
+        self.play(Create(plane), Create(circle))
+
+        theta = PI / 3
+        point = plane.c2p(np.cos(theta), np.sin(theta))
+        radius = Line(plane.c2p(0, 0), point, color=YELLOW)
+        cos_line = Line(plane.c2p(0, 0), plane.c2p(np.cos(theta), 0), color=GREEN)
+        sin_line = Line(plane.c2p(np.cos(theta), 0), point, color=RED)
+        angle = Angle(cos_line, radius, radius=0.4)
+        self.play(Create(radius), Create(angle))
+        self.play(Create(cos_line), Create(sin_line))
+
+        facts = VGroup(
+            MathTex(r"\theta = \frac{\pi}{3}"),
+            MathTex(r"\cos\theta = \frac{1}{2}", color=GREEN),
+            MathTex(r"\sin\theta = \frac{\sqrt{3}}{2}", color=RED),
+        ).arrange(DOWN, aligned_edge=LEFT, buff=0.4).to_edge(RIGHT).shift(DOWN * 0.4)
+        for fact in facts:
+            self.play(Write(fact))
+        self.wait(2)
+"""
+    },
+
+    {
+        "user": "How do I add fractions with different denominators?",
+        "tags": "arithmetic fractions add common denominator numerator equivalent fractions",
+        "code": r"""
+from manim import *
+
+class AddingFractions(Scene):
+    def bar(self, parts, shaded, color):
+        cells = VGroup(*[
+            Rectangle(width=6 / parts, height=0.6, fill_color=color if i < shaded else BLACK,
+                      fill_opacity=0.7 if i < shaded else 0)
+            for i in range(parts)
+        ]).arrange(RIGHT, buff=0)
+        return cells
+
+    def construct(self):
+        title = Text("Adding Fractions", weight=BOLD).scale_to_fit_width(5).to_edge(UP)
+        problem = MathTex(r"\frac{1}{2} + \frac{1}{3} = \ ?").next_to(title, DOWN)
+        self.play(FadeIn(title), Write(problem))
+
+        half = self.bar(2, 1, BLUE)
+        third = self.bar(3, 1, RED)
+        bars = VGroup(half, third).arrange(DOWN, buff=0.5).shift(DOWN * 0.5)
+        self.play(Create(half), Create(third))
+
+        sixths_half = self.bar(6, 3, BLUE).move_to(half)
+        sixths_third = self.bar(6, 2, RED).move_to(third)
+        self.play(Transform(half, sixths_half), Transform(third, sixths_third))
+
+        answer = MathTex(r"\frac{3}{6} + \frac{2}{6} = \frac{5}{6}").next_to(bars, DOWN, buff=0.6)
+        self.play(Write(answer))
+        self.wait(2)
+"""
+    },
+
+    {
+        "user": "What does it mean to add two vectors?",
+        "tags": "linear algebra vectors vector addition tip to tail arrows components physics",
+        "code": r"""
+from manim import *
+
+class VectorAddition(Scene):
+    def construct(self):
+        title = Text("Adding Vectors Tip to Tail", weight=BOLD).scale_to_fit_width(7).to_edge(UP)
+        self.play(FadeIn(title))
+
+        plane = NumberPlane(x_range=[-1, 5, 1], y_range=[-1, 4, 1], x_length=6, y_length=4.5)
+        plane.to_edge(LEFT).shift(DOWN * 0.4)
+        self.play(Create(plane))
+
+        origin = plane.c2p(0, 0)
+        u = Arrow(origin, plane.c2p(3, 1), buff=0, color=BLUE)
+        v = Arrow(origin, plane.c2p(1, 2), buff=0, color=RED)
+        self.play(GrowArrow(u), GrowArrow(v))
+
+        v_moved = Arrow(plane.c2p(3, 1), plane.c2p(4, 3), buff=0, color=RED)
+        self.play(Transform(v, v_moved))
+        total = Arrow(origin, plane.c2p(4, 3), buff=0, color=YELLOW)
+        self.play(GrowArrow(total))
+
+        math = VGroup(
+            MathTex(r"\vec u = (3, 1)", color=BLUE),
+            MathTex(r"\vec v = (1, 2)", color=RED),
+            MathTex(r"\vec u + \vec v = (4, 3)", color=YELLOW),
+        ).arrange(DOWN, aligned_edge=LEFT, buff=0.4).to_edge(RIGHT)
+        self.play(Write(math))
+        self.wait(2)
+"""
+    },
+
+    {
+        "user": "Walk me through solving 2x + 3 = 11",
+        "tags": "algebra solve linear equation one variable isolate x steps inverse operations",
+        "code": r"""
+from manim import *
+
+class SolveLinearEquation(Scene):
+    def construct(self):
+        title = Text("Solving a Linear Equation", weight=BOLD).scale_to_fit_width(7).to_edge(UP)
+        self.play(FadeIn(title))
+
+        steps = [
+            MathTex("2x", "+", "3", "=", "11"),
+            MathTex("2x", "=", "11", "-", "3"),
+            MathTex("2x", "=", "8"),
+            MathTex("x", "=", r"\frac{8}{2}"),
+            MathTex("x", "=", "4"),
+        ]
+        notes = ["start", "subtract 3 from both sides", "simplify", "divide both sides by 2", "solution"]
+
+        equation = steps[0].scale(1.4)
+        note = Text(notes[0], font_size=30).next_to(equation, DOWN, buff=1)
+        self.play(Write(equation), FadeIn(note))
+        for step, text in zip(steps[1:], notes[1:]):
+            step.scale(1.4)
+            new_note = Text(text, font_size=30).next_to(step, DOWN, buff=1)
+            self.play(TransformMatchingTex(equation, step), FadeTransform(note, new_note))
+            equation, note = step, new_note
+            self.wait(0.5)
+
+        self.play(Circumscribe(equation, color=YELLOW))
+        self.wait(2)
+"""
+    },
+
+    {
+        "user": "How do you find the mean of a data set?",
+        "tags": "statistics data mean average median bar chart probability distribution",
+        "code": r"""
+from manim import *
+from mathinq_layout import LayoutManager
+
+class MeanOfData(Scene):
+    def construct(self):
+        layout = LayoutManager(self)
+        title = layout.place_top_left(Text("Finding the Mean", weight=BOLD))
+        self.play(FadeIn(title))
+
+        values = [4, 7, 5, 8, 6]
+        chart = BarChart(values, bar_names=["A", "B", "C", "D", "E"], y_range=[0, 10, 2],
+                         x_length=5.5, y_length=4).to_edge(LEFT).shift(DOWN * 0.4)
+        self.play(Create(chart))
+
+        mean_line = DashedLine(chart.c2p(0, 6), chart.c2p(5, 6), color=YELLOW)
+        self.play(Create(mean_line))
+
+        work = VGroup(
+            MathTex(r"\bar{x} = \frac{4 + 7 + 5 + 8 + 6}{5}"),
+            MathTex(r"= \frac{30}{5} = 6"),
+            Text("the dashed line is the mean", font_size=26, color=YELLOW),
+        ).arrange(DOWN, aligned_edge=LEFT, buff=0.4)
+        layout.autoscale(work, max_ratio=0.4)
+        layout.safe_position(work, RIGHT * 3.5)
+        self.play(Write(work[0]))
+        self.play(Write(work[1]), FadeIn(work[2]))
+        self.wait(2)
+"""
+    },
 ]
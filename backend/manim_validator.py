@@ -0,0 +1,167 @@
+# manim_validator.py
+import ast
+import re
+from typing import List, Optional
+
+# Static checks for generated Manim code, mirroring the rules in the system prompt of
+# generate_manim_code. Runs in milliseconds, so bad generations never reach a render.
+
+LATEX_DELIMITERS = re.compile(r"\$|\\\(|\\\)|\\\[|\\\]")
+# complete inline / display math spans; a $ only opens before and closes after a non-space,
+# and never closes right before a digit, so "$5 and $10" is prices, not math
+MATH_SPAN = re.compile(r"\$(?=\S)[^$]+?(?<=\S)\$(?!\d)|\\\(.+?\\\)|\\\[.+?\\\]", re.DOTALL)
+# characters LaTeX treats specially outside math mode
+LATEX_SPECIALS = re.compile(r"[&%#_^{}~\\]")
+TEXT_CLASSES = ("Text", "MarkupText")
+# keyword arguments Tex understands; a Text call using any other (font, weight, ...) isn't auto-fixed
+TEX_KWARGS = ("color", "font_size", "fill_opacity", "stroke_width", "tex_environment", "arg_separator")
+
+
+class ManimValidationError(Exception):
+    """Raised for code that fails validation; report holds the rules that fired."""
+
+    def __init__(self, report: "ValidationReport"):
+        super().__init__(f"Generated code failed validation:\n{report.summary()}")
+        self.report = report
+
+
+class ValidationReport:
+    """Result of validate_manim_code: the (possibly fixed) code plus which rules fired."""
+
+    def __init__(self, code: str):
+        self.code = code
+        self.errors: List[str] = []
+        self.fixes: List[str] = []
+        self.scene_name: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def summary(self) -> str:
+        lines = [f"error: {e}" for e in self.errors] + [f"fixed: {f}" for f in self.fixes]
+        return "\n".join(lines) if lines else "ok"
+
+
+def _call_name(node: ast.Call) -> Optional[str]:
+    if isinstance(node.func, ast.Name):
+        return node.func.id
+    if isinstance(node.func, ast.Attribute):
+        return node.func.attr
+    return None
+
+
+def _string_parts(node: ast.AST) -> List[str]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, ast.JoinedStr):
+        return [v.value for v in node.values if isinstance(v, ast.Constant) and isinstance(v.value, str)]
+    return []
+
+
+def _is_scene_class(node: ast.ClassDef) -> bool:
+    for base in node.bases:
+        name = base.id if isinstance(base, ast.Name) else getattr(base, "attr", "")
+        if name.endswith("Scene"):
+            return True
+    return False
+
+
+def _has_latex_in_text(node: ast.AST) -> bool:
+    return (isinstance(node, ast.Call) and _call_name(node) in TEXT_CLASSES
+            and any(LATEX_DELIMITERS.search(part) for arg in node.args for part in _string_parts(arg)))
+
+
+def _is_valid_tex_text(text: str) -> bool:
+    """Balanced math spans only, with nothing outside them that LaTeX would choke on."""
+    rest = MATH_SPAN.sub("", text)
+    return not LATEX_DELIMITERS.search(rest) and not LATEX_SPECIALS.search(rest)
+
+
+def _tex_fixable(node: ast.Call) -> bool:
+    # plain strings only, and no Text-only keyword that Tex would lose
+    if not all(isinstance(arg, ast.Constant) and isinstance(arg.value, str) for arg in node.args):
+        return False
+    if any(kw.arg not in TEX_KWARGS for kw in node.keywords):
+        return False
+    if _call_name(node) == "MarkupText" and any("<" in arg.value for arg in node.args):
+        return False
+    return all(_is_valid_tex_text(arg.value) for arg in node.args)
+
+
+class _LatexInTextFixer(ast.NodeTransformer):
+    """
+    Text("Solve $x^2$") -> Tex("Solve $x^2$"), which renders the inline math properly.
+    Calls that wouldn't be valid LaTeX as they stand (stray $, &, %, Text-only keywords)
+    are left alone and listed in unfixable_lines.
+    """
+
+    def __init__(self):
+        self.fixed_lines: List[int] = []
+        self.unfixable_lines: List[int] = []
+
+    def visit_Call(self, node: ast.Call):
+        self.generic_visit(node)
+        if not _has_latex_in_text(node):
+            return node
+        if not _tex_fixable(node):
+            self.unfixable_lines.append(node.lineno)
+            return node
+
+        if isinstance(node.func, ast.Name):
+            node.func.id = "Tex"
+        else:
+            node.func.attr = "Tex"
+        self.fixed_lines.append(node.lineno)
+        return node
+
+
+def validate_manim_code(code: str, autofix: bool = True) -> ValidationReport:
+    """
+    Checks generated code against the prompt rules:
+    - parses as Python
+    - defines exactly one Scene class
+    - no LaTeX delimiters inside Text strings (auto-fixed to Tex when autofix is on and
+      the string is valid LaTeX as it stands)
+    - no axes.get_tangent_line
+    """
+    report = ValidationReport(code)
+
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        report.errors.append(f"syntax_error: line {e.lineno}: {e.msg}")
+        return report
+
+    scenes = [n for n in ast.walk(tree) if isinstance(n, ast.ClassDef) and _is_scene_class(n)]
+    if not scenes:
+        report.errors.append("missing_scene: no Scene subclass defined")
+    elif len(scenes) > 1:
+        names = ", ".join(n.name for n in scenes)
+        report.errors.append(f"multiple_scenes: expected exactly one Scene class, found {names}")
+    else:
+        report.scene_name = scenes[0].name
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute) and node.attr == "get_tangent_line":
+            report.errors.append(f"banned_tangent_line: line {node.lineno}: use TangentLine(graph, x0, ...) instead")
+
+    fixer = _LatexInTextFixer()
+    if autofix:
+        tree = fixer.visit(tree)
+        # any call left as it was fails validation anyway; keep the code as the model wrote it
+        if fixer.fixed_lines and not fixer.unfixable_lines:
+            report.code = ast.unparse(ast.fix_missing_locations(tree))
+            lines = ", ".join(str(n) for n in fixer.fixed_lines)
+            report.fixes.append(f"latex_in_text: line(s) {lines}: Text -> Tex")
+        for lineno in fixer.unfixable_lines:
+            report.errors.append(
+                f"latex_in_text: line {lineno}: LaTeX delimiters inside Text "
+                "(use Tex/MathTex for math, or plain text without $)"
+            )
+    else:
+        for node in ast.walk(tree):
+            if _has_latex_in_text(node):
+                report.errors.append(f"latex_in_text: line {node.lineno}: LaTeX delimiters inside Text")
+
+    return report
@@ -0,0 +1,74 @@
+# mathinq_layout.py
+from manim import DL, DR, ORIGIN, UL, UR
+
+# Layout helper importable from every generated scene (`from mathinq_layout import LayoutManager`),
+# so the model doesn't have to write it out in each script. Renders run with backend/ on sys.path.
+
+
+class LayoutManager:
+    """Keeps mobjects inside a margin of the frame and scales them to a share of its width."""
+
+    def __init__(self, scene, margin_ratio=0.08):
+        self.scene = scene
+        self.margin_ratio = margin_ratio
+
+        fw = scene.camera.frame_width
+        fh = scene.camera.frame_height
+
+        self.left = -fw / 2 + fw * margin_ratio
+        self.right = fw / 2 - fw * margin_ratio
+        self.top = fh / 2 - fh * margin_ratio
+        self.bottom = -fh / 2 + fh * margin_ratio
+
+    def pull_inside(self, mobj):
+        """Shift mobj back inside the safe zone."""
+        xmin, xmax = mobj.get_left()[0], mobj.get_right()[0]
+        ymin, ymax = mobj.get_bottom()[1], mobj.get_top()[1]
+
+        dx = 0
+        dy = 0
+        if xmin < self.left:
+            dx = self.left - xmin
+        if xmax > self.right:
+            dx = self.right - xmax
+        if ymin < self.bottom:
+            dy = self.bottom - ymin
+        if ymax > self.top:
+            dy = self.top - ymax
+
+        mobj.shift([dx, dy, 0])
+        return mobj
+
+    # the name the old inline versions used; generated code still reaches for it
+    _pull_inside = pull_inside
+
+    def autoscale(self, mobj, max_ratio=0.45):
+        """Shrink mobj to at most max_ratio of the frame width."""
+        fw = self.scene.camera.frame_width
+        if mobj.width > fw * max_ratio:
+            mobj.scale_to_fit_width(fw * max_ratio)
+        return mobj
+
+    def safe_position(self, mobj, pos):
+        mobj.move_to(pos)
+        return self.pull_inside(mobj)
+
+    def place_top_left(self, mobj):
+        mobj.to_corner(UL)
+        return self.pull_inside(mobj)
+
+    def place_top_right(self, mobj):
+        mobj.to_corner(UR)
+        return self.pull_inside(mobj)
+
+    def place_bottom_left(self, mobj):
+        mobj.to_corner(DL)
+        return self.pull_inside(mobj)
+
+    def place_bottom_right(self, mobj):
+        mobj.to_corner(DR)
+        return self.pull_inside(mobj)
+
+    def place_center(self, mobj):
+        mobj.move_to(ORIGIN)
+        return self.pull_inside(mobj)
@@ -0,0 +1,143 @@
+# openai_client.py
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional
+
+import httpx
+import openai
+
+# One OpenAI client per process, over a pooled keep-alive transport.
+# Every call gets a per-call-type timeout and our own retry policy: jittered exponential
+# backoff on 429 / 5xx / connection errors. With MATHINQ_OPENAI_HEDGE=1, a non-streaming
+# call still running after its call type's p95 latency gets a second identical request,
+# and whichever answers first wins.
+MAX_CONNECTIONS = int(os.environ.get("MATHINQ_OPENAI_MAX_CONNECTIONS", "32"))
+MAX_RETRIES = int(os.environ.get("MATHINQ_OPENAI_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.environ.get("MATHINQ_OPENAI_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.environ.get("MATHINQ_OPENAI_BACKOFF_MAX", "20"))
+HEDGE = os.environ.get("MATHINQ_OPENAI_HEDGE", "0") == "1"
+# latencies kept per call type for the p95, and how many before hedging kicks in
+HEDGE_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+
+# seconds per call type (the label passed through llm_cache / llm_usage)
+TIMEOUTS = {
+    "manim": 120.0,
+    "manim_continue": 120.0,
+    "narration": 30.0,
+    "practice": 45.0,
+    "tts": 60.0,
+}
+DEFAULT_TIMEOUT = 60.0
+CONNECT_TIMEOUT = 10.0
+
+RETRYABLE = (openai.RateLimitError, openai.InternalServerError,
+             openai.APIConnectionError, openai.APITimeoutError)
+
+_lock = threading.Lock()
+_client: Optional[openai.OpenAI] = None
+_latencies: Dict[str, Deque[float]] = {}
+_hedge_executor = ThreadPoolExecutor(max_workers=MAX_CONNECTIONS, thread_name_prefix="openai-hedge")
+
+
+def timeout_for(label: str) -> httpx.Timeout:
+    return httpx.Timeout(TIMEOUTS.get(label, DEFAULT_TIMEOUT), connect=CONNECT_TIMEOUT)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS,
+                        keepalive_expiry=60)
+
+
+def get_client() -> openai.OpenAI:
+    global _client
+    with _lock:
+        if _client is None:
+            _client = openai.OpenAI(
+                api_key=os.environ["OPENAI_API_KEY"],
+                http_client=httpx.Client(limits=_limits(), timeout=timeout_for("")),
+                max_retries=0,  # retried here, with jitter
+            )
+        return _client
+
+
+def _backoff(attempt: int, error: Exception) -> float:
+    """Full-jitter exponential backoff; a Retry-After header sets the floor."""
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return max(delay, float(retry_after)) if retry_after else delay
+    except ValueError:
+        return delay
+
+
+def _observe(label: str, seconds: float) -> None:
+    with _lock:
+        _latencies.setdefault(label, deque(maxlen=HEDGE_WINDOW)).append(seconds)
+
+
+def p95(label: str) -> Optional[float]:
+    with _lock:
+        samples = sorted(_latencies.get(label, ()))
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return None
+    return samples[int(0.95 * (len(samples) - 1))]
+
+
+def _with_retries(label: str, fn: Callable[[], Any]) -> Any:
+    for attempt in range(MAX_RETRIES + 1):
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except RETRYABLE as e:
+            if attempt == MAX_RETRIES:
+                raise
+            delay = _backoff(attempt, e)
+            print(f"⚠️ OpenAI {label} call failed ({type(e).__name__}); retry {attempt + 1}/{MAX_RETRIES} in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        _observe(label, time.perf_counter() - start)
+        return result
+
+
+def call(label: str, fn: Callable[[], Any], hedge: bool = HEDGE) -> Any:
+    """
+    fn() with retries. With hedge, a call slower than the label's p95 gets a second,
+    identical attempt and the first result back is returned (the other is discarded).
+    Only hedge idempotent, non-streaming calls.
+    """
+    threshold = p95(label) if hedge else None
+    if threshold is None:
+        return _with_retries(label, fn)
+
+    first = _hedge_executor.submit(_with_retries, label, fn)
+    done, _ = wait([first], timeout=threshold)
+    if done:
+        return first.result()
+
+    print(f"🐢 OpenAI {label} call past p95 ({threshold:.1f}s); sending a hedged request")
+    second = _hedge_executor.submit(_with_retries, label, fn)
+    done, _ = wait([first, second], return_when=FIRST_COMPLETED)
+    winner = done.pop()
+    if winner.exception() is not None:
+        # the other one may still succeed
+        other = second if winner is first else first
+        return other.result()
+    return winner.result()
+
+
+def chat_completion(client: Optional[openai.OpenAI], label: str, **kwargs) -> Any:
+    """client.chat.completions.create(**kwargs) with the label's timeout, retries and hedging."""
+    client = client or get_client()
+
+    def request():
+        return client.chat.completions.create(timeout=timeout_for(label), **kwargs)
+
+    # a stream can't be hedged; retries only cover opening it
+    return call(label, request, hedge=HEDGE and not kwargs.get("stream"))
+
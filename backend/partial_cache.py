@@ -0,0 +1,159 @@
+# partial_cache.py
+import atexit
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Dict, List
+
+from shared_stats import SharedCounter, locked
+
+# Manim names each play()/wait() clip after a hash of the camera, the animation and the
+# mobjects on screen, and skips rendering when that clip already exists in the scene's
+# partial_movie_dir. Every render has its own workspace, so on its own that only helps
+# within a render; this store shares the clips across renders. Render processes call
+# install(): a lookup that misses locally is served from here (hard link, else copy), and
+# finished scenes publish their new clips back. Least recently used clips are evicted
+# once the store is over PARTIAL_CACHE_MAX_MB.
+PARTIAL_CACHE_DIR = Path(os.environ.get("MATHINQ_PARTIAL_CACHE_DIR", "partial_cache")).resolve()
+PARTIAL_CACHE_ENABLED = os.environ.get("MATHINQ_PARTIAL_CACHE", "1") != "0"
+PARTIAL_CACHE_MAX_MB = float(os.environ.get("MATHINQ_PARTIAL_CACHE_MAX_MB", "2048"))
+STATS_PATH = PARTIAL_CACHE_DIR / "stats.json"
+VIDEO_SUFFIXES = (".mp4", ".mov", ".webm")
+
+_stats = SharedCounter(STATS_PATH, ("hits", "misses", "stored"))
+_installed = False
+
+
+def _entry_path(hash_invocation: str, suffix: str) -> Path:
+    return PARTIAL_CACHE_DIR / hash_invocation[:2] / f"{hash_invocation}{suffix}"
+
+
+def _link_or_copy(src: Path, dest: Path) -> None:
+    """Put src at dest atomically; a hard link when both sit on the same filesystem."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dest.with_name(f"{dest.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        shutil.copyfile(src, tmp_path)
+    os.replace(tmp_path, dest)
+
+
+def _entries() -> List[Path]:
+    if not PARTIAL_CACHE_DIR.exists():
+        return []
+    return [p for p in PARTIAL_CACHE_DIR.glob("*/*") if p.suffix in VIDEO_SUFFIXES]
+
+
+def fetch(hash_invocation: str, dest: Path) -> bool:
+    """Link the cached clip for hash_invocation to dest. Returns False on a miss."""
+    cached = _entry_path(hash_invocation, dest.suffix)
+    try:
+        _link_or_copy(cached, dest)
+    except FileNotFoundError:
+        return False
+    # mtime is the LRU clock: a hit makes the clip recent again
+    try:
+        os.utime(cached)
+    except OSError:
+        pass
+    return True
+
+
+def publish(paths: List[str]) -> int:
+    """Add finished clips to the store (uncached_* clips from disable_caching are skipped)."""
+    stored = 0
+    for path in paths:
+        if not path:
+            continue
+        path = Path(path)
+        if path.name.startswith("uncached_") or not path.exists():
+            continue
+        entry = _entry_path(path.stem, path.suffix)
+        if entry.exists():
+            continue
+        _link_or_copy(path, entry)
+        stored += 1
+    return stored
+
+
+def evict(max_bytes: float = PARTIAL_CACHE_MAX_MB * 1024 * 1024) -> int:
+    """Delete least recently used clips until the store fits in max_bytes. Returns how many."""
+    with locked(PARTIAL_CACHE_DIR / "evict.lock"):
+        entries = []
+        for path in _entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+    return removed
+
+
+def install() -> None:
+    """
+    Hook manim's SceneFileWriter so partial movie lookups fall back to the shared store
+    and finished scenes publish their clips to it. Call inside the render process,
+    after importing manim.
+    """
+    global _installed
+    if _installed or not PARTIAL_CACHE_ENABLED:
+        return
+    _installed = True
+
+    from manim.scene.scene_file_writer import SceneFileWriter
+
+    original_is_already_cached = SceneFileWriter.is_already_cached
+    original_finish = SceneFileWriter.finish
+
+    def is_already_cached(self, hash_invocation):
+        if original_is_already_cached(self, hash_invocation):
+            return True
+        if hash_invocation.startswith("uncached_"):
+            return False
+        dest = Path(self.partial_movie_directory) / f"{hash_invocation}{self.movie_file_extension}"
+        hit = fetch(hash_invocation, dest)
+        _stats.add("hits" if hit else "misses")
+        return hit
+
+    def finish(self):
+        try:
+            _stats.add("stored", publish([str(p) for p in self.partial_movie_files if p]))
+        except OSError as e:
+            print(f"⚠️ Could not publish partial movie files: {e}")
+        return original_finish(self)
+
+    SceneFileWriter.is_already_cached = is_already_cached
+    SceneFileWriter.finish = finish
+    atexit.register(flush)
+
+
+def flush() -> None:
+    """Publish hit/miss counts and enforce the size bound (warm workers call this per render)."""
+    if not _installed:
+        return
+    _stats.flush()
+    evict()
+
+
+def stats() -> Dict[str, float]:
+    totals = _stats.totals()
+    lookups = totals["hits"] + totals["misses"]
+    totals["hit_rate"] = totals["hits"] / lookups if lookups else 0.0
+    entries = _entries()
+    totals["entries"] = len(entries)
+    totals["bytes"] = sum(p.stat().st_size for p in entries if p.exists())
+    totals["max_bytes"] = int(PARTIAL_CACHE_MAX_MB * 1024 * 1024)
+    return totals
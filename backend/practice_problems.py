@@ -1,6 +1,5 @@
 # practice_problems.py
-import openai
-import os
+import openai_client
 import re
 import matplotlib
 
@@ -10,7 +9,9 @@ matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import tempfile
 
-client = openai.OpenAI(api_key=os.environ["OPENAI_API_KEY"])
+from llm_cache import cached_chat_completion
+
+client = openai_client.get_client()
 
 
 def format_practice_problems_prompt(user_query: str) -> str:
@@ -65,15 +66,16 @@ Here is the user query:
 
 def get_practice_problem(user_query: str) -> str:
     """Call the model and return raw text containing {{PROBLEM}} and {{ANSWER}} sections."""
-    response = client.chat.completions.create(
+    return cached_chat_completion(
+        client,
         model="gpt-4o",
         messages=[
             {"role": "user", "content": format_practice_problems_prompt(user_query)}
         ],
         max_tokens=300,  # bumped up to reduce truncation issues
         temperature=0.3,
+        label="practice",
     )
-    return response.choices[0].message.content
 
 
 def extract_problem(text: str) -> str | None:
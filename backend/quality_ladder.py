@@ -0,0 +1,66 @@
+# quality_ladder.py
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+from backend import RenderError, render_manim_video
+from ffmpeg_utils import replace_video_stream
+from render_profiles import HIGH_PROFILE
+
+# Return the preview render right away, then re-render the same code at HIGH_PROFILE
+# in the background (low scheduler priority, reniced) and swap the asset when done.
+QUALITY_LADDER = os.environ.get("MATHINQ_QUALITY_LADDER", "0") == "1"
+UPGRADE_WORKERS = int(os.environ.get("MATHINQ_UPGRADE_WORKERS", "1"))
+
+_executor = ThreadPoolExecutor(max_workers=UPGRADE_WORKERS, thread_name_prefix="upgrade")
+
+
+def upgrade_video(manim_code: str, manim_command: str, preview_path: str,
+                  output_dir="outputs") -> Optional[str]:
+    """
+    Render manim_code at the high profile and give it the preview's audio track.
+    Returns the new mp4 path (next to output_dir), or None if the upgrade failed.
+    """
+    try:
+        hq_video = render_manim_video(
+            manim_code, manim_command, output_dir, low_priority=True, profile=HIGH_PROFILE
+        )
+    except RenderError as e:
+        print("❌ Quality upgrade render failed:")
+        print(e.stderr or e)
+        return None
+
+    output_path = str(Path(output_dir) / f"{uuid.uuid4()}.mp4")
+    upgraded = replace_video_stream(hq_video, preview_path, output_path)
+    os.remove(hq_video)
+    return upgraded
+
+
+def schedule_upgrade(manim_code: str, manim_command: str, preview_path: str,
+                     on_done: Callable[[str], None], on_failed: Callable[[], None],
+                     output_dir="outputs") -> None:
+    """
+    Queue upgrade_video. on_done(path) is called with the high-quality mp4 when it exists,
+    on_failed() when the upgrade failed for any reason.
+    """
+
+    def run():
+        try:
+            path = upgrade_video(manim_code, manim_command, preview_path, output_dir)
+        except Exception as e:
+            # the executor would swallow it and leave the job "upgrading" forever
+            print(f"❌ Quality upgrade failed: {e}")
+            path = None
+        if path:
+            print(f"✅ High-quality video ready: {path}")
+            on_done(path)
+        else:
+            on_failed()
+
+    _executor.submit(run)
+
+
+def shutdown() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
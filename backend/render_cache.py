@@ -0,0 +1,71 @@
+# render_cache.py
+import ast
+import hashlib
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+# Finished MP4s keyed by sha256(canonical scene code + render flags)
+RENDER_CACHE_DIR = Path(os.environ.get("MATHINQ_RENDER_CACHE_DIR", "render_cache"))
+RENDER_CACHE_ENABLED = os.environ.get("MATHINQ_RENDER_CACHE", "1") != "0"
+# scenes import the layout helper at render time, so editing it must invalidate cached renders
+_LAYOUT_HELPER_HASH = hashlib.sha256(Path(__file__).with_name("mathinq_layout.py").read_bytes()).hexdigest()
+
+
+def canonicalize_code(code: str) -> str:
+    """
+    Normalize scene code so whitespace, comments and quoting style don't change the key.
+    Falls back to the stripped source if the code doesn't parse.
+    """
+    try:
+        return ast.dump(ast.parse(code), annotate_fields=False, include_attributes=False)
+    except SyntaxError:
+        return code.strip()
+
+
+def render_flags(parts: List[str], script_path: str) -> List[str]:
+    """The effective manim arguments, without the binary and the (temporary) script path."""
+    return [p for p in parts[1:] if p != script_path]
+
+
+def render_key(code: str, flags: List[str]) -> str:
+    h = hashlib.sha256()
+    h.update(canonicalize_code(code).encode("utf-8"))
+    h.update(b"\0")
+    h.update("\0".join(flags).encode("utf-8"))
+    h.update(b"\0")
+    h.update(_LAYOUT_HELPER_HASH.encode("utf-8"))
+    return h.hexdigest()
+
+
+def _entry_path(key: str) -> Path:
+    return RENDER_CACHE_DIR / key[:2] / f"{key}.mp4"
+
+
+def lookup(key: str) -> Optional[Path]:
+    if not RENDER_CACHE_ENABLED:
+        return None
+    path = _entry_path(key)
+    return path if path.exists() else None
+
+
+def fetch(key: str, dest: Path) -> Optional[str]:
+    """Copy a cached render to dest. Returns the dest path, or None on a miss."""
+    cached = lookup(key)
+    if cached is None:
+        return None
+    shutil.copyfile(cached, dest)
+    return str(dest)
+
+
+def store(key: str, video_path: str) -> None:
+    """Add a finished render to the cache (atomic, so concurrent readers never see half a file)."""
+    if not RENDER_CACHE_ENABLED:
+        return
+    path = _entry_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{key}.{uuid.uuid4().hex}.tmp")
+    shutil.copyfile(video_path, tmp_path)
+    os.replace(tmp_path, path)
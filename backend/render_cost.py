@@ -0,0 +1,158 @@
+# render_cost.py
+import ast
+import math
+import os
+from typing import Any, Dict, Optional
+
+from render_profiles import PROFILES
+
+# Static estimate of what a scene will cost to render, read off the AST before any render starts.
+MAX_VIDEO_SECONDS = float(os.environ.get("MATHINQ_MAX_VIDEO_SECONDS", "120"))
+MAX_TEX = int(os.environ.get("MATHINQ_MAX_TEX", "80"))
+# iterations assumed for loops whose count isn't a literal range(...)
+LOOP_GUESS = 3
+
+DEFAULT_RUN_TIME = 1.0
+DEFAULT_WAIT = 1.0
+TEX_CLASSES = ("MathTex", "Tex", "SingleStringMathTex", "Title", "BulletedList",
+               "DecimalNumber", "Integer", "Variable")
+
+
+class RenderBudgetExceeded(Exception):
+    pass
+
+
+class RenderCost:
+    """Estimated play() count, animated/waited seconds and Tex objects for one scene."""
+
+    def __init__(self):
+        self.plays = 0.0
+        self.animation_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.tex_count = 0.0
+
+    @property
+    def seconds(self) -> float:
+        return self.animation_seconds + self.wait_seconds
+
+    def frames(self, fps: float) -> int:
+        return int(self.seconds * fps)
+
+    def to_dict(self, fps: Optional[float] = None) -> Dict[str, Any]:
+        out = {
+            "plays": round(self.plays),
+            "animation_seconds": round(self.animation_seconds, 2),
+            "wait_seconds": round(self.wait_seconds, 2),
+            "seconds": round(self.seconds, 2),
+            "tex_count": round(self.tex_count),
+        }
+        if fps:
+            out["fps"] = fps
+            out["frames"] = self.frames(fps)
+        return out
+
+
+def _number(node: Optional[ast.AST]) -> Optional[float]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return float(node.value)
+    return None
+
+
+def _keyword(call: ast.Call, name: str) -> Optional[ast.AST]:
+    for kw in call.keywords:
+        if kw.arg == name:
+            return kw.value
+    return None
+
+
+def _loop_count(node: ast.AST) -> float:
+    """Iterations of a for/while/comprehension: exact for literal ranges and lists, else LOOP_GUESS."""
+    iterable = getattr(node, "iter", None)
+    if isinstance(iterable, (ast.List, ast.Tuple)):
+        return float(len(iterable.elts))
+    if isinstance(iterable, ast.Call) and isinstance(iterable.func, ast.Name) and iterable.func.id == "range":
+        bounds = [_number(a) for a in iterable.args]
+        if bounds and None not in bounds:
+            if len(bounds) == 1:
+                bounds = [0.0, bounds[0]]
+            start, stop = bounds[0], bounds[1]
+            step = bounds[2] if len(bounds) > 2 and bounds[2] else 1.0
+            return float(max(0, math.ceil((stop - start) / step)))
+    return float(LOOP_GUESS)
+
+
+def _self_call(node: ast.Call, name: str) -> bool:
+    return isinstance(node.func, ast.Attribute) and node.func.attr == name \
+        and isinstance(node.func.value, ast.Name) and node.func.value.id == "self"
+
+
+def _play_run_time(call: ast.Call) -> float:
+    run_time = _number(_keyword(call, "run_time"))
+    if run_time is not None:
+        return run_time
+    # run_time given to an animation inside play(Create(x, run_time=2), ...)
+    nested = [
+        _number(_keyword(n, "run_time")) for arg in call.args
+        for n in ast.walk(arg) if isinstance(n, ast.Call)
+    ]
+    nested = [n for n in nested if n is not None]
+    return max(nested) if nested else DEFAULT_RUN_TIME
+
+
+def _walk(node: ast.AST, cost: RenderCost, weight: float) -> None:
+    if isinstance(node, (ast.For, ast.While, ast.comprehension)):
+        weight *= _loop_count(node)
+
+    if isinstance(node, ast.Call):
+        name = node.func.id if isinstance(node.func, ast.Name) else getattr(node.func, "attr", None)
+        if _self_call(node, "play"):
+            cost.plays += weight
+            cost.animation_seconds += weight * _play_run_time(node)
+        elif _self_call(node, "wait"):
+            duration = _number(node.args[0]) if node.args else _number(_keyword(node, "duration"))
+            cost.wait_seconds += weight * (DEFAULT_WAIT if duration is None else duration)
+        elif name in TEX_CLASSES:
+            cost.tex_count += weight
+
+    for child in ast.iter_child_nodes(node):
+        _walk(child, cost, weight)
+
+
+def estimate_render_cost(code: str) -> RenderCost:
+    cost = RenderCost()
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return cost
+    _walk(tree, cost, 1.0)
+    return cost
+
+
+def fit_budget(cost: RenderCost, profile: str) -> int:
+    """
+    The fps to render this scene at under the profile: the profile's own fps, lowered
+    (down to min_fps) when the frame count is over max_frames.
+    Raises RenderBudgetExceeded when the scene can't fit at all.
+    """
+    settings = PROFILES[profile]
+    if cost.seconds > MAX_VIDEO_SECONDS:
+        raise RenderBudgetExceeded(
+            f"Scene runs about {cost.seconds:.0f}s of animation and waits; the limit is "
+            f"{MAX_VIDEO_SECONDS:.0f}s. Shorten it (fewer play() calls, shorter run_time/wait)."
+        )
+    if cost.tex_count > MAX_TEX:
+        raise RenderBudgetExceeded(
+            f"Scene creates about {cost.tex_count:.0f} Tex/MathTex objects; the limit is {MAX_TEX}. "
+            "Use fewer formulas."
+        )
+
+    fps = settings["fps"]
+    if cost.frames(fps) <= settings["max_frames"]:
+        return fps
+    clamped = int(settings["max_frames"] / cost.seconds) if cost.seconds else fps
+    if clamped < settings["min_fps"]:
+        raise RenderBudgetExceeded(
+            f"Scene needs about {cost.frames(settings['min_fps'])} frames even at "
+            f"{settings['min_fps']} fps; the budget is {settings['max_frames']}. Shorten it."
+        )
+    return clamped
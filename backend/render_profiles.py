@@ -0,0 +1,74 @@
+# render_profiles.py
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+# Named quality settings for manim, enforced by the server: whatever quality flags the
+# model writes are replaced. max_frames is the per-render budget checked by render_cost;
+# scenes over it are rendered at a lower fps (down to min_fps) or rejected.
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "preview": {"flags": ["-ql", "-r", "480,270"], "fps": 10, "min_fps": 6, "max_frames": 900},
+    "high": {"flags": ["-qm", "-r", "1280,720"], "fps": 30, "min_fps": 15, "max_frames": 2700},
+}
+PREVIEW_PROFILE = os.environ.get("MATHINQ_PREVIEW_PROFILE", "preview")
+HIGH_PROFILE = os.environ.get("MATHINQ_HIGH_PROFILE", "high")
+
+# quality-related flags that take a value; --format too, since the workspace expects an mp4
+VALUE_FLAGS = ("-q", "--quality", "-r", "--resolution", "--fps", "--frame_rate", "--format")
+# opening a preview player makes no sense on the server
+PREVIEW_FLAGS = ("-p", "--preview")
+# single-dash short flags written together, e.g. "-pqh" for "-p -qh"
+COMBINED_SHORT_FLAGS = re.compile(r"-[a-zA-Z]{2,}")
+
+
+def _split_combined_flag(arg: str) -> Optional[str]:
+    """
+    "-pqh" -> None, "-sqm" -> "-s": drops p, and q with the quality letter after it,
+    keeping any other letters. Other arguments come back unchanged.
+    """
+    if not COMBINED_SHORT_FLAGS.fullmatch(arg):
+        return arg
+    letters = arg[1:]
+    kept = ""
+    i = 0
+    while i < len(letters):
+        if letters[i] == "q":
+            i += 2
+            continue
+        if letters[i] != "p":
+            kept += letters[i]
+        i += 1
+    return f"-{kept}" if kept else None
+
+
+def strip_quality_flags(args: List[str]) -> List[str]:
+    """Remove quality / resolution / fps / preview flags (and their values) from manim arguments."""
+    out = []
+    i = 0
+    while i < len(args):
+        arg = _split_combined_flag(args[i])
+        if arg is None or arg in PREVIEW_FLAGS or any(arg.startswith(flag + "=") for flag in VALUE_FLAGS):
+            i += 1
+            continue
+        if arg in VALUE_FLAGS:
+            i += 2
+            # "-r 480, 270" arrives as two tokens
+            if arg in ("-r", "--resolution") and args[i - 1].endswith(",") and i < len(args) and args[i].isdigit():
+                i += 1
+            continue
+        out.append(arg)
+        i += 1
+    return out
+
+
+def apply_profile(command: str, profile: str, fps: Optional[int] = None) -> str:
+    """
+    Replace whatever quality flags the command has with the named profile's.
+    fps overrides the profile's frame rate (used when clamping to the frame budget).
+    """
+    settings = PROFILES[profile]
+    parts = strip_quality_flags(command.split())
+    if not parts:
+        parts = ["manim"]
+    flags = [*settings["flags"], "--fps", str(fps or settings["fps"])]
+    return " ".join([parts[0], *flags, *parts[1:]])
@@ -0,0 +1,146 @@
+# render_scheduler.py
+import os
+import subprocess
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+
+def physical_cores() -> List[Set[int]]:
+    """
+    Group the CPUs we may run on by physical core (hyperthread siblings together).
+    Falls back to one group per logical CPU when the topology isn't readable.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+    else:
+        cpus = list(range(os.cpu_count() or 1))
+
+    groups: Dict[str, Set[int]] = {}
+    for cpu in cpus:
+        siblings = Path(f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list")
+        try:
+            key = siblings.read_text().strip()
+        except OSError:
+            key = str(cpu)
+        groups.setdefault(key, set()).add(cpu)
+    return list(groups.values())
+
+
+class RenderSlot:
+    """One granted render slot: the CPUs the render is pinned to and how long it queued."""
+
+    def __init__(self, index: int, cpus: Set[int], wait_seconds: float):
+        self.index = index
+        self.cpus = cpus
+        self.wait_seconds = wait_seconds
+
+
+class RenderScheduler:
+    """
+    Caps concurrent renders at max_concurrent. Callers beyond the cap wait in
+    FIFO order; each granted slot carries a fixed set of cores to pin to.
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None):
+        cores = physical_cores()
+        self.max_concurrent = max(1, max_concurrent or len(cores))
+
+        # spread the cores over the slots; with more slots than cores they share
+        self._slot_cpus: List[Set[int]] = [set() for _ in range(self.max_concurrent)]
+        for i, core in enumerate(cores):
+            self._slot_cpus[i % self.max_concurrent] |= core
+        for i, cpus in enumerate(self._slot_cpus):
+            if not cpus:
+                cpus |= cores[i % len(cores)]
+
+        self._free = deque(range(self.max_concurrent))
+        self._waiters: deque = deque()
+        # background work (e.g. quality upgrades) only runs when no normal render is waiting
+        self._low_waiters: deque = deque()
+        self._cond = threading.Condition()
+        self._stats = {"renders": 0, "queued": 0, "running": 0,
+                       "total_wait_seconds": 0.0, "total_render_seconds": 0.0}
+
+    def acquire(self, low_priority: bool = False) -> RenderSlot:
+        start = time.perf_counter()
+        ticket = object()
+        waiters = self._low_waiters if low_priority else self._waiters
+        with self._cond:
+            waiters.append(ticket)
+            self._stats["queued"] += 1
+            while waiters[0] is not ticket or not self._free or (low_priority and self._waiters):
+                self._cond.wait()
+            waiters.popleft()
+            index = self._free.popleft()
+            self._stats["queued"] -= 1
+            self._stats["running"] += 1
+            # the next waiter may be able to go too
+            self._cond.notify_all()
+
+        wait = time.perf_counter() - start
+        return RenderSlot(index, self._slot_cpus[index], wait)
+
+    def release(self, slot: RenderSlot, render_seconds: float) -> None:
+        with self._cond:
+            self._free.append(slot.index)
+            self._stats["running"] -= 1
+            self._stats["renders"] += 1
+            self._stats["total_wait_seconds"] += slot.wait_seconds
+            self._stats["total_render_seconds"] += render_seconds
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, low_priority: bool = False):
+        slot = self.acquire(low_priority)
+        print(f"⏳ Render queue wait: {slot.wait_seconds:.2f}s (slot {slot.index}, cpus {sorted(slot.cpus)})")
+        start = time.perf_counter()
+        try:
+            yield slot
+        finally:
+            render_seconds = time.perf_counter() - start
+            print(f"🎞️ Render time: {render_seconds:.2f}s")
+            self.release(slot, render_seconds)
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            out = dict(self._stats)
+        out["max_concurrent"] = self.max_concurrent
+        renders = out["renders"]
+        out["mean_wait_seconds"] = out["total_wait_seconds"] / renders if renders else 0.0
+        out["mean_render_seconds"] = out["total_render_seconds"] / renders if renders else 0.0
+        return out
+
+
+def run_pinned(args: List[str], slot: RenderSlot, niceness: int = 0, **kwargs) -> subprocess.CompletedProcess:
+    """
+    subprocess.run(args, check=True, capture_output=True, text=True, ...) with the child
+    pinned to the slot's cpus (and reniced when niceness > 0). Processes it spawns
+    (latex, ffmpeg) inherit both.
+    """
+    with subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, **kwargs) as proc:
+        if hasattr(os, "sched_setaffinity"):
+            try:
+                os.sched_setaffinity(proc.pid, slot.cpus)
+            except OSError:
+                pass
+        if niceness and hasattr(os, "setpriority"):
+            try:
+                os.setpriority(os.PRIO_PROCESS, proc.pid, niceness)
+            except OSError:
+                pass
+        try:
+            stdout, stderr = proc.communicate()
+        except BaseException:
+            proc.kill()
+            raise
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, args, output=stdout, stderr=stderr)
+    return subprocess.CompletedProcess(args, proc.returncode, stdout, stderr)
+
+
+_concurrency = os.environ.get("MATHINQ_RENDER_CONCURRENCY")
+scheduler = RenderScheduler(int(_concurrency) if _concurrency else None)
@@ -0,0 +1,83 @@
+# render_workspace.py
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+from tex_cache import TEX_CACHE_DIR
+
+# Every render gets its own scratch tree under here, removed once the video is moved out
+RENDER_WORK_DIR = os.environ.get("MATHINQ_RENDER_WORK_DIR") or None
+OUTPUT_NAME = "render"
+
+# Flags the workspace owns; any the model emits are dropped
+RESERVED_FLAGS = ("-o", "--output_file", "--media_dir", "--config_file", "--video_dir")
+
+
+def strip_reserved_flags(args: List[str]) -> List[str]:
+    """Remove the output/media flags (and their values) from a manim argument list."""
+    out = []
+    skip = False
+    for arg in args:
+        if skip:
+            skip = False
+            continue
+        if arg in RESERVED_FLAGS:
+            skip = True
+            continue
+        if any(arg.startswith(flag + "=") for flag in RESERVED_FLAGS):
+            continue
+        out.append(arg)
+    return out
+
+
+class RenderWorkspace:
+    """
+    Scratch directory for a single render: the scene script, a manim.cfg that
+    flattens the video directory and points Tex at the shared cache, and a media
+    dir. The finished video always lands at output_path, so nothing has to scan
+    media/ for it.
+    """
+
+    def __init__(self, code: str, work_dir: Optional[str] = RENDER_WORK_DIR):
+        if work_dir:
+            os.makedirs(work_dir, exist_ok=True)
+        self.root = Path(tempfile.mkdtemp(prefix="mathinq_render_", dir=work_dir))
+        self.script_path = self.root / "scene.py"
+        self.config_path = self.root / "manim.cfg"
+        self.media_dir = self.root / "media"
+
+        self.script_path.write_text(code, encoding="utf-8")
+        self.config_path.write_text(
+            "[CLI]\n"
+            "video_dir = {media_dir}/videos\n"
+            "partial_movie_dir = {video_dir}/partial_movie_files/{scene_name}\n"
+            f"tex_dir = {TEX_CACHE_DIR}\n",
+            encoding="utf-8",
+        )
+
+    @property
+    def output_path(self) -> Path:
+        return self.media_dir / "videos" / f"{OUTPUT_NAME}.mp4"
+
+    @property
+    def partial_movie_dir(self) -> Path:
+        return self.media_dir / "videos" / "partial_movie_files"
+
+    def manim_args(self) -> List[str]:
+        return [
+            "--config_file", str(self.config_path),
+            "--media_dir", str(self.media_dir),
+            "-o", OUTPUT_NAME,
+        ]
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+        return False
@@ -1,12 +1,39 @@
 # rlhf.py
 import sqlite3
+import atexit
 import json
+import os
+import hashlib
+import queue
+import threading
 import time
 import uuid
+import zlib
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 
 DB_PATH = Path("rlhf.db")
+# Writes go through one background connection that commits in batches:
+# up to WRITE_BATCH_SIZE rows, or whatever arrived within WRITE_BATCH_SECONDS.
+WRITE_BATCH_SIZE = int(os.environ.get("MATHINQ_RLHF_BATCH_SIZE", "256"))
+WRITE_BATCH_SECONDS = float(os.environ.get("MATHINQ_RLHF_BATCH_SECONDS", "0.05"))
+# NORMAL is safe in WAL mode (a power cut may lose the last commits, never corrupt the db)
+SYNCHRONOUS = os.environ.get("MATHINQ_RLHF_SYNCHRONOUS", "NORMAL")
+
+INSERT_SAMPLE = """
+    INSERT INTO samples (
+        id, prompt, manim_code_hash, manim_command_hash, narration_hash,
+        video_path, audio_path, created_at, meta_json
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_BLOB = "INSERT OR IGNORE INTO blobs (hash, codec, size, data) VALUES (?, ?, ?, ?)"
+INSERT_FEEDBACK = """
+    INSERT INTO feedback (
+        sample_id, rating, comment, created_at, meta_json
+    )
+    VALUES (?, ?, ?, ?, ?)
+"""
 
 
 def _get_connection():
@@ -19,6 +46,8 @@ def init_db() -> None:
     """Create tables if they don't exist."""
     conn = _get_connection()
     cur = conn.cursor()
+    # WAL is persistent, and lets readers (exports, stats) run alongside the writer
+    cur.execute("PRAGMA journal_mode=WAL")
 
     # One row per generated sample (video + audio + code)
     cur.execute(
@@ -52,9 +81,250 @@ def init_db() -> None:
     )
 
     conn.commit()
+    migrate(conn)
     conn.close()
 
 
+# Schema changes on top of the base tables, applied in order; PRAGMA user_version
+# records how many an existing rlhf.db already has. Append only, never edit.
+MIGRATIONS = [
+    # 1: indexes for lookups by sample and time range
+    """
+    CREATE INDEX IF NOT EXISTS idx_feedback_sample_id ON feedback(sample_id);
+    CREATE INDEX IF NOT EXISTS idx_feedback_created_at ON feedback(created_at);
+    CREATE INDEX IF NOT EXISTS idx_samples_created_at ON samples(created_at);
+    """,
+    # 2: aggregates kept up to date by triggers, backfilled from existing rows
+    """
+    CREATE TABLE IF NOT EXISTS sample_stats (
+        sample_id TEXT PRIMARY KEY,
+        up INTEGER NOT NULL DEFAULT 0,
+        down INTEGER NOT NULL DEFAULT 0,
+        last_feedback_at REAL
+    );
+    CREATE TABLE IF NOT EXISTS daily_stats (
+        day TEXT PRIMARY KEY,               -- UTC date, YYYY-MM-DD
+        samples INTEGER NOT NULL DEFAULT 0,
+        up INTEGER NOT NULL DEFAULT 0,
+        down INTEGER NOT NULL DEFAULT 0
+    );
+
+    CREATE TRIGGER IF NOT EXISTS feedback_stats AFTER INSERT ON feedback
+    BEGIN
+        INSERT INTO sample_stats (sample_id, up, down, last_feedback_at)
+        VALUES (NEW.sample_id, NEW.rating > 0, NEW.rating < 0, NEW.created_at)
+        ON CONFLICT(sample_id) DO UPDATE SET
+            up = up + excluded.up,
+            down = down + excluded.down,
+            last_feedback_at = max(last_feedback_at, excluded.last_feedback_at);
+        INSERT INTO daily_stats (day, up, down)
+        VALUES (date(NEW.created_at, 'unixepoch'), NEW.rating > 0, NEW.rating < 0)
+        ON CONFLICT(day) DO UPDATE SET up = up + excluded.up, down = down + excluded.down;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS sample_daily_stats AFTER INSERT ON samples
+    BEGIN
+        INSERT INTO daily_stats (day, samples) VALUES (date(NEW.created_at, 'unixepoch'), 1)
+        ON CONFLICT(day) DO UPDATE SET samples = samples + 1;
+    END;
+
+    INSERT OR REPLACE INTO sample_stats (sample_id, up, down, last_feedback_at)
+    SELECT sample_id, SUM(rating > 0), SUM(rating < 0), MAX(created_at) FROM feedback GROUP BY sample_id;
+    INSERT OR REPLACE INTO daily_stats (day, samples, up, down)
+    SELECT day, SUM(samples), SUM(up), SUM(down) FROM (
+        SELECT date(created_at, 'unixepoch') AS day, 1 AS samples, 0 AS up, 0 AS down FROM samples
+        UNION ALL
+        SELECT date(created_at, 'unixepoch'), 0, rating > 0, rating < 0 FROM feedback
+    ) GROUP BY day;
+    """,
+    # 3: code, command and narration live in a content-addressed, compressed blob table,
+    # so identical generations are stored once; samples hold the hashes. The old
+    # manim_code/narration_text columns stay readable for rows written before this.
+    """
+    CREATE TABLE IF NOT EXISTS blobs (
+        hash TEXT PRIMARY KEY,              -- sha256 of the uncompressed text
+        codec TEXT NOT NULL,
+        size INTEGER NOT NULL,              -- uncompressed bytes
+        data BLOB NOT NULL
+    );
+    ALTER TABLE samples ADD COLUMN manim_code_hash TEXT REFERENCES blobs(hash);
+    ALTER TABLE samples ADD COLUMN manim_command_hash TEXT REFERENCES blobs(hash);
+    ALTER TABLE samples ADD COLUMN narration_hash TEXT REFERENCES blobs(hash);
+    """,
+]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Bring conn's schema up to date. Returns the schema version."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+        # executescript commits first; the BEGIN/COMMIT makes each migration all-or-nothing
+        conn.executescript(f"BEGIN;\n{script}\nPRAGMA user_version = {number};\nCOMMIT;")
+        print(f"✅ Applied rlhf.db migration {number}")
+    return max(version, len(MIGRATIONS))
+
+
+def encode_blob(text: Optional[str]) -> Optional[Tuple[str, str, int, bytes]]:
+    """(hash, codec, size, data) row for the blobs table, or None for missing/empty text."""
+    if not text:
+        return None
+    raw = text.encode("utf-8")
+    return hashlib.sha256(raw).hexdigest(), "zlib", len(raw), zlib.compress(raw, 9)
+
+
+def decode_blob(codec: Optional[str], data: Optional[bytes]) -> Optional[str]:
+    if data is None:
+        return None
+    if codec != "zlib":
+        raise Exception(f"Unknown blob codec: {codec}")
+    return zlib.decompress(data).decode("utf-8")
+
+
+def _rate(up: int, down: int) -> Optional[float]:
+    return up / (up + down) if up + down else None
+
+
+def stats(days: int = 30) -> Dict[str, Any]:
+    """Totals and the last `days` days of sample counts and thumbs-up rates, read from the aggregates."""
+    conn = _get_connection()
+    try:
+        rows = conn.execute(
+            "SELECT day, samples, up, down FROM daily_stats ORDER BY day DESC LIMIT ?", (days,)
+        ).fetchall()
+        totals = conn.execute(
+            "SELECT COALESCE(SUM(samples), 0), COALESCE(SUM(up), 0), COALESCE(SUM(down), 0) FROM daily_stats"
+        ).fetchone()
+        rated = conn.execute("SELECT COUNT(*) FROM sample_stats").fetchone()[0]
+    finally:
+        conn.close()
+
+    samples, up, down = totals
+    return {
+        "samples": samples,
+        "rated_samples": rated,
+        "up": up,
+        "down": down,
+        "up_rate": _rate(up, down),
+        "daily": [
+            {"day": r["day"], "samples": r["samples"], "up": r["up"], "down": r["down"],
+             "up_rate": _rate(r["up"], r["down"])}
+            for r in reversed(rows)
+        ],
+    }
+
+
+def sample_stats(sample_id: str) -> Optional[Dict[str, Any]]:
+    """Up/down counts for one sample, or None if it has no feedback yet."""
+    conn = _get_connection()
+    try:
+        row = conn.execute(
+            "SELECT up, down, last_feedback_at FROM sample_stats WHERE sample_id = ?", (sample_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    return {"sample_id": sample_id, "up": row["up"], "down": row["down"],
+            "up_rate": _rate(row["up"], row["down"]), "last_feedback_at": row["last_feedback_at"]}
+
+
+class RlhfWriter:
+    """
+    Write-behind logger: callers enqueue rows and return at once; a single thread owns
+    a long-lived connection and commits whatever is queued as one transaction.
+    """
+
+    def __init__(self, db_path: Path = DB_PATH):
+        self.db_path = db_path
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="rlhf-writer", daemon=True)
+                self._thread.start()
+
+    def write(self, sql: str, rows: List[Tuple]) -> None:
+        self._ensure_started()
+        for row in rows:
+            self._queue.put((sql, row))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far is committed. Returns False on timeout."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Commit what's queued and stop the writer thread."""
+        if self._thread is None:
+            return
+        self.flush(timeout)
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _next_batch(self) -> Tuple[list, bool]:
+        """(items, stop): blocks for the first item, then gathers until the batch is full or stale."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + WRITE_BATCH_SECONDS
+        while batch[-1] is not None and len(batch) < WRITE_BATCH_SIZE:
+            try:
+                batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+            except queue.Empty:
+                break
+        stop = batch[-1] is None
+        return [item for item in batch if item is not None], stop
+
+    def _commit(self, conn: sqlite3.Connection, writes: List[Tuple[str, Tuple]]) -> None:
+        try:
+            with conn:
+                for sql, row in writes:
+                    conn.execute(sql, row)
+        except sqlite3.Error as e:
+            # keep the good rows: retry one at a time and drop only the ones that fail
+            print(f"⚠️ RLHF batch of {len(writes)} failed ({e}); retrying row by row")
+            for sql, row in writes:
+                try:
+                    with conn:
+                        conn.execute(sql, row)
+                except sqlite3.Error as row_error:
+                    print(f"❌ Dropped RLHF row: {row_error}")
+
+    def _run(self) -> None:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={SYNCHRONOUS}")
+        try:
+            stop = False
+            while not stop:
+                items, stop = self._next_batch()
+                writes = [item for item in items if not isinstance(item, threading.Event)]
+                if writes:
+                    self._commit(conn, writes)
+                for item in items:
+                    if isinstance(item, threading.Event):
+                        item.set()
+        finally:
+            conn.close()
+
+
+writer = RlhfWriter()
+atexit.register(writer.close)
+
+
+def flush(timeout: Optional[float] = None) -> bool:
+    return writer.flush(timeout)
+
+
+def close() -> None:
+    writer.close()
+
+
 def log_sample(
     prompt: str,
     manim_code: str,
@@ -62,37 +332,32 @@ def log_sample(
     video_path: str,
     audio_path: str,
     meta: Optional[Dict[str, Any]] = None,
+    manim_command: Optional[str] = None,
 ) -> str:
     """
     Store one generated example (what the model produced) and return a sample_id.
     You can return this sample_id to the frontend along with video/audio URLs.
+    The code, command and narration go to the blobs table (compressed, deduplicated).
     """
     sample_id = str(uuid.uuid4())
-    conn = _get_connection()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        INSERT INTO samples (
-            id, prompt, manim_code, narration_text,
-            video_path, audio_path, created_at, meta_json
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
+    blobs = [encode_blob(manim_code), encode_blob(manim_command), encode_blob(narration_text)]
+    # queued in order, so the blobs commit no later than the sample that references them
+    writer.write(INSERT_BLOB, [blob for blob in blobs if blob is not None])
+    code_hash, command_hash, narration_hash = [blob[0] if blob else None for blob in blobs]
+    writer.write(
+        INSERT_SAMPLE,
+        [(
             sample_id,
             prompt,
-            manim_code,
-            narration_text,
+            code_hash,
+            command_hash,
+            narration_hash,
             video_path,
             audio_path,
             time.time(),
             json.dumps(meta or {}),
-        ),
+        )],
     )
-
-    conn.commit()
-    conn.close()
     return sample_id
 
 
@@ -108,24 +373,26 @@ def log_feedback(
     comment: optional free-text from user
     meta: anything extra from frontend (e.g. device, duration watched)
     """
-    conn = _get_connection()
-    cur = conn.cursor()
+    log_feedback_batch([{"sample_id": sample_id, "rating": rating, "comment": comment, "meta": meta}])
 
-    cur.execute(
-        """
-        INSERT INTO feedback (
-            sample_id, rating, comment, created_at, meta_json
-        )
-        VALUES (?, ?, ?, ?, ?)
-        """,
-        (
-            sample_id,
-            rating,
-            comment,
-            time.time(),
-            json.dumps(meta or {}),
-        ),
-    )
 
-    conn.commit()
-    conn.close()
+def log_feedback_batch(events: List[Dict[str, Any]]) -> int:
+    """
+    Queue many feedback events (dicts with sample_id, rating and optional comment/meta)
+    to be committed together. Returns how many were queued.
+    """
+    now = time.time()
+    writer.write(
+        INSERT_FEEDBACK,
+        [
+            (
+                event["sample_id"],
+                event["rating"],
+                event.get("comment"),
+                now,
+                json.dumps(event.get("meta") or {}),
+            )
+            for event in events
+        ],
+    )
+    return len(events)
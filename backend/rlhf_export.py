@@ -0,0 +1,156 @@
+# rlhf_export.py
+import argparse
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from rlhf import DB_PATH, decode_blob
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # only needed for --format parquet
+    pyarrow = None
+
+# Stream feedback joined with its sample out of rlhf.db, CHUNK_ROWS at a time, so memory
+# stays flat however big the table is. Exports are ordered by (created_at, id) and the last
+# pair written is saved as a watermark, so the next run can pick up where this one stopped.
+CHUNK_ROWS = 5000
+
+COLUMNS = [
+    "feedback_id", "sample_id", "rating", "comment", "feedback_at", "feedback_meta",
+    "prompt", "manim_code", "manim_command", "narration_text", "video_path", "audio_path",
+    "sample_at", "sample_meta",
+]
+
+QUERY = """
+    SELECT
+        f.id AS feedback_id, f.sample_id, f.rating, f.comment,
+        f.created_at AS feedback_at, f.meta_json AS feedback_meta,
+        s.prompt, s.video_path, s.audio_path,
+        s.created_at AS sample_at, s.meta_json AS sample_meta,
+        s.manim_code AS inline_code, s.narration_text AS inline_narration,
+        code.codec AS code_codec, code.data AS code_data,
+        command.codec AS command_codec, command.data AS command_data,
+        narration.codec AS narration_codec, narration.data AS narration_data
+    FROM feedback f
+    JOIN samples s ON s.id = f.sample_id
+    LEFT JOIN blobs code ON code.hash = s.manim_code_hash
+    LEFT JOIN blobs command ON command.hash = s.manim_command_hash
+    LEFT JOIN blobs narration ON narration.hash = s.narration_hash
+    WHERE (f.created_at > ? OR (f.created_at = ? AND f.id > ?))
+"""
+
+
+def load_watermark(path: Optional[Path]) -> Dict[str, float]:
+    if path is None or not path.exists():
+        return {"created_at": 0.0, "id": 0}
+    return json.loads(path.read_text())
+
+
+def save_watermark(path: Path, watermark: Dict[str, float]) -> None:
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(watermark))
+    tmp_path.replace(path)
+
+
+def _export_row(row: sqlite3.Row) -> Dict[str, Any]:
+    out = {column: row[column] for column in COLUMNS if column in row.keys()}
+    # rows logged before the blobs table kept their text inline
+    out["manim_code"] = decode_blob(row["code_codec"], row["code_data"]) or row["inline_code"]
+    out["manim_command"] = decode_blob(row["command_codec"], row["command_data"])
+    out["narration_text"] = decode_blob(row["narration_codec"], row["narration_data"]) or row["inline_narration"]
+    for column in ("feedback_meta", "sample_meta"):
+        out[column] = json.loads(out[column]) if out[column] else {}
+    return {column: out[column] for column in COLUMNS}
+
+
+def iter_chunks(db_path: Path = DB_PATH, since: Optional[Dict[str, float]] = None,
+                rating: Optional[int] = None, chunk_rows: int = CHUNK_ROWS) -> Iterator[List[Dict[str, Any]]]:
+    """Lists of up to chunk_rows export rows (dicts keyed by COLUMNS), oldest feedback first."""
+    since = since or {"created_at": 0.0, "id": 0}
+    sql = QUERY
+    params: List[Any] = [since["created_at"], since["created_at"], since["id"]]
+    if rating is not None:
+        sql += " AND f.rating = ?"
+        params.append(rating)
+    sql += " ORDER BY f.created_at, f.id"
+
+    # read-only, so a running server's writer is never blocked (WAL)
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield [_export_row(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def _parquet_schema():
+    # explicit, so a first chunk full of NULLs doesn't fix a column's type to null
+    types = {"feedback_id": pyarrow.int64(), "rating": pyarrow.int64(),
+             "feedback_at": pyarrow.float64(), "sample_at": pyarrow.float64()}
+    return pyarrow.schema([(column, types.get(column, pyarrow.string())) for column in COLUMNS])
+
+
+def export(output: Path, fmt: str = "jsonl", db_path: Path = DB_PATH, rating: Optional[int] = None,
+           watermark_path: Optional[Path] = None, chunk_rows: int = CHUNK_ROWS) -> int:
+    """
+    Write rows newer than the watermark to output and advance the watermark.
+    JSONL appends to output; Parquet writes a new file (one per incremental run).
+    Returns the number of rows written.
+    """
+    if fmt == "parquet" and pyarrow is None:
+        raise Exception("Parquet export needs pyarrow (pip install pyarrow).")
+
+    since = load_watermark(watermark_path)
+    written = 0
+    parquet_writer = None
+    jsonl_file = open(output, "a", encoding="utf-8") if fmt == "jsonl" else None
+    try:
+        for chunk in iter_chunks(db_path, since, rating, chunk_rows):
+            if fmt == "jsonl":
+                for row in chunk:
+                    jsonl_file.write(json.dumps(row, ensure_ascii=False) + "\n")
+            else:
+                for row in chunk:
+                    row["feedback_meta"] = json.dumps(row["feedback_meta"])
+                    row["sample_meta"] = json.dumps(row["sample_meta"])
+                if parquet_writer is None:
+                    parquet_writer = pyarrow.parquet.ParquetWriter(str(output), _parquet_schema())
+                parquet_writer.write_table(pyarrow.Table.from_pylist(chunk, schema=parquet_writer.schema))
+            written += len(chunk)
+            since = {"created_at": chunk[-1]["feedback_at"], "id": chunk[-1]["feedback_id"]}
+    finally:
+        if jsonl_file is not None:
+            jsonl_file.close()
+        if parquet_writer is not None:
+            parquet_writer.close()
+
+    # only once the data is safely written, so a crash re-exports rather than skips
+    if watermark_path is not None:
+        save_watermark(watermark_path, since)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export RLHF samples joined with feedback.")
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--rating", type=int, choices=[1, -1], help="only thumbs up (1) or down (-1)")
+    parser.add_argument("--watermark", type=Path, help="resume after (and then update) this watermark file")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    count = export(args.output, args.format, args.db, args.rating, args.watermark, args.chunk_rows)
+    print(f"✅ Exported {count} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
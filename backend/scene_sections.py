@@ -0,0 +1,107 @@
+# scene_sections.py
+import ast
+from typing import List, Optional, Tuple
+
+# Split a scene into independently renderable animation ranges for manim's -n flag.
+# manim counts every play() and wait() as one animation; with "-n a,b" it still runs
+# the whole construct() (so all state is rebuilt) but only renders animations a..b.
+
+
+def _is_self_call(node: ast.AST, names: Tuple[str, ...]) -> bool:
+    return isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) \
+        and node.func.attr in names and isinstance(node.func.value, ast.Name) \
+        and node.func.value.id == "self"
+
+
+def _statement_call(stmt: ast.stmt) -> Optional[ast.Call]:
+    if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Call):
+        return stmt.value
+    return None
+
+
+def _is_animation(stmt: ast.stmt) -> bool:
+    return _is_self_call(_statement_call(stmt), ("play", "wait"))
+
+
+def _cut_before(stmt: ast.stmt) -> bool:
+    """self.next_section(...) / self.clear(): a new section starts here."""
+    return _is_self_call(_statement_call(stmt), ("next_section", "clear"))
+
+
+def _cut_after(stmt: ast.stmt) -> bool:
+    """self.play(FadeOut(*self.mobjects)) and friends: the screen is empty after this."""
+    call = _statement_call(stmt)
+    if not _is_self_call(call, ("play",)):
+        return False
+    names = {n.id for n in ast.walk(call) if isinstance(n, ast.Name)}
+    clears_all = any(
+        isinstance(n, ast.Attribute) and n.attr == "mobjects"
+        and isinstance(n.value, ast.Name) and n.value.id == "self"
+        for n in ast.walk(call)
+    )
+    return "FadeOut" in names and clears_all
+
+
+def _find_construct(tree: ast.Module) -> Optional[ast.FunctionDef]:
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef) and node.name == "construct":
+            return node
+    return None
+
+
+def _merge(sections: List[Tuple[int, int]], max_sections: int) -> List[Tuple[int, int]]:
+    """Join neighbouring sections until there are at most max_sections, keeping them balanced."""
+    if len(sections) <= max_sections:
+        return sections
+    target = (sections[-1][1] + 1 - sections[0][0]) / max_sections
+    merged: List[Tuple[int, int]] = []
+    start = sections[0][0]
+    for _, end in sections[:-1]:
+        # the last group always takes whatever is left
+        if end + 1 - start >= target and len(merged) < max_sections - 1:
+            merged.append((start, end))
+            start = end + 1
+    merged.append((start, sections[-1][1]))
+    return merged
+
+
+def split_sections(code: str, max_sections: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Inclusive (first, last) animation ranges, cut at next_section()/clear() and at
+    FadeOut-everything plays. Returns None when the scene can't be split safely: only
+    scenes whose every play()/wait() is a top-level statement of construct() qualify,
+    because loops and helper methods make the animation numbering unknowable statically.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+    construct = _find_construct(tree)
+    if construct is None:
+        return None
+
+    all_animations = sum(
+        1 for n in ast.walk(tree)
+        if isinstance(n, ast.Call) and isinstance(n.func, ast.Attribute) and n.func.attr in ("play", "wait")
+    )
+    top_level = [stmt for stmt in construct.body if _is_animation(stmt)]
+    if all_animations != len(top_level):
+        return None
+
+    sections: List[Tuple[int, int]] = []
+    start = 0
+    count = 0
+    for stmt in construct.body:
+        if _cut_before(stmt) and count > start:
+            sections.append((start, count - 1))
+            start = count
+        if _is_animation(stmt):
+            count += 1
+        if _cut_after(stmt) and count > start:
+            sections.append((start, count - 1))
+            start = count
+    if count > start:
+        sections.append((start, count - 1))
+
+    sections = _merge(sections, max_sections)
+    return sections if len(sections) >= 2 else None
@@ -4,10 +4,23 @@ from fastapi.responses import FileResponse
 import uuid
 import os
 from pydantic import BaseModel
-from rlhf import init_db, log_sample, log_feedback
+from typing import List
+import rlhf
+from rlhf import init_db, log_sample, log_feedback, log_feedback_batch
 
-from backend import pipeline  # your pipeline function
+from backend import RENDER_BACKEND, pipeline  # your pipeline function
 from practice_problems import prob_ans_pipeline
+from jobs import JobQueue
+import quality_ladder
+import llm_cache
+import llm_usage
+import render_scheduler
+import warm_render
+import partial_cache
+import tex_cache
+from hls_stream import HLS_DIR
+import subprocess
+import sys
 
 
 app = FastAPI()
@@ -28,55 +41,158 @@ def health():
     return {"status": "ok"}
 
 
-@app.post("/generate")
-def generate(query: str):
+@app.get("/cache/stats")
+def cache_stats():
+    return {"llm": llm_cache.stats(), "tex": tex_cache.stats(), "partial": partial_cache.stats()}
+
+
+@app.get("/stats")
+def feedback_stats(days: int = 30):
+    """Sample counts and thumbs-up rates, overall and per day (from the aggregate tables)."""
+    return rlhf.stats(days)
+
+
+@app.get("/stats/samples/{sample_id}")
+def sample_feedback_stats(sample_id: str):
+    result = rlhf.sample_stats(sample_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No feedback for this sample")
+    return result
+
+
+@app.get("/llm/usage")
+def llm_usage_stats():
+    """Prompt/completion/cached tokens and latency per call type since startup."""
+    return llm_usage.stats()
+
+
+@app.get("/render/stats")
+def render_stats():
+    return render_scheduler.scheduler.stats()
+
+
+def run_generate_job(query: str, cancel_event=None, progress=None, update_result=None):
     """
-    Run the AI+Manim pipeline and return URLs for:
-    - the raw video (mp4)
-    - the generated audio (mp3)
+    Run the AI+Manim pipeline for one queued job and return URLs for:
+    - the video (mp4, with the narration muxed in)
+    - the generated audio (mp3), only when muxing was off or failed
     """
+    print("🎬 Running pipeline...")
 
-    try:
-        print("🎬 Running pipeline...")
+    result = pipeline(query, cancel_event=cancel_event, progress=progress)
+    video_path, audio_path = result.video_path, result.audio_path
 
-        video_path, audio_path = pipeline(query)
+    # Validate output
+    if not video_path or not os.path.exists(video_path):
+        raise Exception("Pipeline failed: No video created.")
 
-        # Validate output
-        if not video_path or not os.path.exists(video_path):
-            raise HTTPException(status_code=500, detail="Pipeline failed: No video created.")
+    if audio_path and not os.path.exists(audio_path):
+        raise Exception("Pipeline failed: No audio created.")
 
-        if not audio_path or not os.path.exists(audio_path):
-            raise HTTPException(status_code=500, detail="Pipeline failed: No audio created.")
+    # Generate unique public filenames
+    video_id = f"{uuid.uuid4()}.mp4"
+    public_video_path = f"outputs/{video_id}"
+    os.rename(video_path, public_video_path)
 
-        # Generate unique public filenames
-        video_id = f"{uuid.uuid4()}.mp4"
+    audio_id = None
+    public_audio_path = None
+    if audio_path:
         audio_id = f"{uuid.uuid4()}.mp3"
-
-        public_video_path = f"outputs/{video_id}"
         public_audio_path = f"outputs/{audio_id}"
-
-        os.rename(video_path, public_video_path)
         os.rename(audio_path, public_audio_path)
 
-        sample_id = log_sample(
-            prompt=query,
-            manim_code="",           # we aren't passing code right now
-            narration_text=None,     # not needed yet
-            video_path=public_video_path,
-            audio_path=public_audio_path,
-            meta={"source": "api"},  # optional
+    sample_id = log_sample(
+        prompt=query,
+        manim_code=result.manim_code,
+        narration_text=result.narration_text,
+        video_path=public_video_path,
+        audio_path=public_audio_path,
+        meta={"source": "api"},  # optional
+        manim_command=result.manim_command,
+    )
+
+    print("✅ Returning file URLs…")
+
+    job_result = {
+        "video_url": f"/video/{video_id}",
+        "audio_url": f"/audio/{audio_id}" if audio_id else None,
+        "sample_id": sample_id,
+        "quality": "preview",
+    }
+
+    if quality_ladder.QUALITY_LADDER and result.manim_code and update_result is not None:
+        # pollers see the swap once the upgrade lands (or the preview stays, if it fails)
+        def swap_in_upgrade(hq_path):
+            update_result(
+                preview_url=job_result["video_url"],
+                video_url=f"/video/{os.path.basename(hq_path)}",
+                quality="high",
+            )
+
+        def keep_preview():
+            update_result(quality="upgrade_failed")
+
+        job_result["quality"] = "upgrading"
+        quality_ladder.schedule_upgrade(
+            result.manim_code, result.manim_command, public_video_path, swap_in_upgrade, keep_preview
         )
 
-        print("✅ Returning file URLs…")
+    return job_result
 
-        return {
-            "video_url": f"/video/{video_id}",
-            "audio_url": f"/audio/{audio_id}",
-            "sample_id": sample_id,
-        }
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+job_queue = JobQueue(run_generate_job)
+
+
+@app.on_event("startup")
+def warm_render_workers():
+    if RENDER_BACKEND == "warm":
+        warm_render.pool.warm_up()
+
+
+@app.on_event("startup")
+def prewarm_tex_cache():
+    # compile the example formulas in the background; renders just find them cached
+    if os.environ.get("MATHINQ_TEX_PREWARM", "1") != "0":
+        subprocess.Popen([sys.executable, tex_cache.__file__, "--prewarm"])
+
+
+@app.on_event("shutdown")
+def shutdown_jobs():
+    job_queue.shutdown(wait=False)
+    quality_ladder.shutdown()
+    warm_render.pool.shutdown()
+
+
+@app.on_event("shutdown")
+def flush_rlhf_log():
+    # commit whatever feedback is still queued before the process exits
+    rlhf.close()
+
+
+@app.post("/generate", status_code=202)
+def generate(query: str):
+    """
+    Queue the pipeline for this query and return a job id right away.
+    Poll GET /jobs/{job_id} for status; the result holds video_url, audio_url and sample_id.
+    """
+    job = job_queue.submit(query)
+    return {"job_id": job.id, "status": job.status}
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    job = job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
 
 
 
@@ -129,6 +245,21 @@ def serve_audio(filename: str):
         raise HTTPException(status_code=404, detail="Audio not found")
     return FileResponse(path, media_type="audio/mpeg", filename=filename)
 
+# Serve live HLS playlists / segments written while a render is running
+@app.get("/stream/{stream_id}/{filename}")
+def serve_stream(stream_id: str, filename: str):
+    if "/" in stream_id or ".." in stream_id or "/" in filename or ".." in filename:
+        raise HTTPException(status_code=404, detail="Stream not found")
+    path = HLS_DIR / stream_id / filename
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Stream not found")
+    if filename.endswith(".m3u8"):
+        # the playlist grows while the render runs, so players must not cache it
+        return FileResponse(path, media_type="application/vnd.apple.mpegurl",
+                            headers={"Cache-Control": "no-cache"})
+    return FileResponse(path, media_type="video/mp2t")
+
+
 @app.get("/practice/problem/{filename}")
 def serve_practice_problem(filename: str):
     path = f"outputs/{filename}"
@@ -165,6 +296,30 @@ def feedback(data: FeedbackIn):
     )
     return {"status": "ok"}
 
+
+class FeedbackBatchIn(BaseModel):
+    events: List[FeedbackIn]
+
+
+@app.post("/feedback/batch")
+def feedback_batch(data: FeedbackBatchIn):
+    """Many feedback events at once (e.g. a classroom's votes); committed in one transaction."""
+    bad = [i for i, event in enumerate(data.events) if event.rating not in (1, -1)]
+    if bad:
+        raise HTTPException(status_code=400, detail=f"rating must be +1 or -1 (events {bad})")
+
+    count = log_feedback_batch([
+        {
+            "sample_id": event.sample_id,
+            "rating": event.rating,
+            "comment": event.comment,
+            "meta": {"source": "frontend", "batch": True},
+        }
+        for event in data.events
+    ])
+    return {"status": "ok", "count": count}
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("server:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,73 @@
+# shared_stats.py
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; callers still work, just without locks
+    fcntl = None
+
+# File locks and hit/miss counters shared by every render process. Each process counts in
+# memory and adds its counts to one JSON file under a lock when it flushes.
+
+
+@contextmanager
+def locked(path: Path):
+    """Exclusive flock on path (created if missing) for the duration of the block."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield f
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class SharedCounter:
+    """Named counts kept per process and merged into the JSON file at path on flush()."""
+
+    def __init__(self, path: Path, names: Iterable[str]):
+        self.path = path
+        self.names = tuple(names)
+        self._counts = {name: 0 for name in self.names}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += n
+
+    def flush(self) -> None:
+        """Add this process's counts to the shared file and start counting from zero."""
+        with self._lock:
+            counts = dict(self._counts)
+            for name in self._counts:
+                self._counts[name] = 0
+        if not any(counts.values()):
+            return
+
+        with locked(self.path.with_suffix(".lock")):
+            totals = self._read()
+            for name, n in counts.items():
+                totals[name] = totals.get(name, 0) + n
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(totals))
+            os.replace(tmp_path, self.path)
+
+    def totals(self) -> Dict[str, float]:
+        """Everything flushed so far, by every process (unflushed counts aren't included)."""
+        totals = self._read()
+        for name in self.names:
+            totals.setdefault(name, 0)
+        return totals
+
+    def _read(self) -> Dict[str, float]:
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
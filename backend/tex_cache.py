@@ -0,0 +1,125 @@
+# tex_cache.py
+import ast
+import atexit
+import hashlib
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from shared_stats import SharedCounter, locked
+
+# One Tex/MathTex SVG directory shared by every render (manim's config.tex_dir).
+# Render processes call install() so identical expressions are compiled once, under a lock.
+TEX_CACHE_DIR = Path(os.environ.get("MATHINQ_TEX_CACHE_DIR", "tex_cache")).resolve()
+STATS_PATH = TEX_CACHE_DIR / "stats.json"
+
+_stats = SharedCounter(STATS_PATH, ("hits", "misses"))
+_installed = False
+
+TEX_CALL = re.compile(r"\b(?:MathTex|Tex)\(\s*((?:r?(?:\"[^\"\n]*\"|'[^'\n]*')\s*,?\s*)+)")
+STRING_LITERAL = re.compile(r"r?(?:\"[^\"\n]*\"|'[^'\n]*')")
+
+
+def install() -> None:
+    """
+    Wrap manim's tex_to_svg_file so concurrent renders serialize on a per-expression
+    lock: the first one compiles, the rest wait and reuse the SVG. Call inside the
+    render process, after importing manim.
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    from manim.utils import tex_file_writing
+
+    original = tex_file_writing.tex_to_svg_file
+
+    def tex_to_svg_file(expression, environment=None, tex_template=None):
+        body = getattr(tex_template, "body", "")
+        key = hashlib.sha256(f"{environment}\0{body}\0{expression}".encode("utf-8")).hexdigest()
+        start = time.time()
+        with locked(TEX_CACHE_DIR / "locks" / f"{key[:16]}.lock"):
+            svg_file = original(expression, environment=environment, tex_template=tex_template)
+
+        hit = Path(svg_file).stat().st_mtime < start
+        _stats.add("hits" if hit else "misses")
+        return svg_file
+
+    # tex_mobject imported the function by name, so patch every manim module holding it
+    for name, module in list(sys.modules.items()):
+        if name.startswith("manim") and getattr(module, "tex_to_svg_file", None) is original:
+            module.tex_to_svg_file = tex_to_svg_file
+
+    atexit.register(flush)
+
+
+def flush() -> None:
+    """Publish counts now (warm workers live long, so they flush after each render)."""
+    _stats.flush()
+
+
+def stats() -> Dict[str, float]:
+    totals = _stats.totals()
+    lookups = totals["hits"] + totals["misses"]
+    totals["hit_rate"] = totals["hits"] / lookups if lookups else 0.0
+    totals["entries"] = len(list(TEX_CACHE_DIR.glob("*.svg"))) if TEX_CACHE_DIR.exists() else 0
+    return totals
+
+
+def find_tex_strings(code: str) -> List[Tuple[str, ...]]:
+    """
+    Argument tuples of every MathTex(...)/Tex(...) call with literal strings in code.
+    Uses a regex rather than ast so partially broken scripts still yield their formulas.
+    """
+    found = []
+    for match in TEX_CALL.finditer(code):
+        args = []
+        for literal in STRING_LITERAL.findall(match.group(1)):
+            try:
+                args.append(ast.literal_eval(literal))
+            except (ValueError, SyntaxError):
+                pass
+        if args:
+            found.append((match.group(0).split("(")[0].strip(),) + tuple(args))
+    return found
+
+
+def prewarm(codes: List[str]) -> int:
+    """Compile every Tex string in codes into the shared cache. Returns how many were found."""
+    from manim import MathTex, Tex, tempconfig
+
+    install()
+    calls = sorted(set(call for code in codes for call in find_tex_strings(code)))
+    classes = {"MathTex": MathTex, "Tex": Tex}
+    with tempconfig({"tex_dir": str(TEX_CACHE_DIR)}):
+        for cls_name, *args in calls:
+            try:
+                classes[cls_name](*args)
+            except Exception as e:
+                print(f"⚠️ Tex prewarm failed for {args}: {e}")
+    flush()
+    return len(calls)
+
+
+if __name__ == "__main__":
+    # python tex_cache.py --prewarm       -> compile the formulas in manim_examples.EXAMPLES
+    # python tex_cache.py <manim args...> -> run the manim CLI with the shared tex and partial movie caches
+    TEX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    if sys.argv[1:] == ["--prewarm"]:
+        from manim_examples import EXAMPLES
+
+        count = prewarm([example["code"] for example in EXAMPLES])
+        print(f"✅ Prewarmed {count} Tex expressions into {TEX_CACHE_DIR}")
+    else:
+        import manim.__main__
+
+        import partial_cache
+
+        install()
+        partial_cache.install()
+        sys.argv[0] = "manim"
+        sys.exit(manim.__main__.main())
@@ -0,0 +1,223 @@
+# warm_render.py
+import importlib.util
+import multiprocessing
+import os
+import shutil
+import sys
+import threading
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import partial_cache
+import render_scheduler
+import tex_cache
+
+# Long-lived render processes that import manim once and render scenes in-process.
+WARM_WORKERS = int(os.environ.get("MATHINQ_WARM_WORKERS", "0")) or render_scheduler.scheduler.max_concurrent
+WARM_WORKER_MAX_JOBS = int(os.environ.get("MATHINQ_WARM_WORKER_MAX_JOBS", "20"))
+
+QUALITY_FLAGS = {
+    "-ql": "low_quality",
+    "-qm": "medium_quality",
+    "-qh": "high_quality",
+    "-qp": "production_quality",
+    "-qk": "fourk_quality",
+}
+QUALITY_NAMES = {"l": "low_quality", "m": "medium_quality", "h": "high_quality",
+                 "p": "production_quality", "k": "fourk_quality"}
+
+
+class WarmRenderError(Exception):
+    """A scene failed inside a warm worker; stderr holds the traceback."""
+
+    def __init__(self, stderr: str):
+        super().__init__(stderr.strip().splitlines()[-1] if stderr.strip() else "warm render failed")
+        self.stderr = stderr
+
+
+class WarmWorkerCrashed(Exception):
+    """
+    The worker process died (not the scene raising), twice in a row. Not a problem with the
+    scene's code as far as we can tell, so it isn't sent back to the model for a repair.
+    """
+
+
+def parse_render_args(args: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Translate manim CLI flags into config values for the warm worker.
+    Returns (config overrides, scene names). Unknown flags are ignored.
+    """
+    options: Dict[str, Any] = {}
+    scene_names: List[str] = []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        value = args[i + 1] if i + 1 < len(args) else None
+
+        if arg in QUALITY_FLAGS:
+            options["quality"] = QUALITY_FLAGS[arg]
+        elif arg in ("-q", "--quality") and value:
+            options["quality"] = QUALITY_NAMES.get(value, value)
+            i += 1
+        elif arg in ("-r", "--resolution") and value:
+            # the prompt asks for "-r 480, 270", which splits into two tokens
+            if value.endswith(",") and i + 2 < len(args) and args[i + 2].isdigit():
+                value += args[i + 2]
+                i += 1
+            i += 1
+            try:
+                width, height = (int(v) for v in value.split(","))
+            except ValueError:
+                pass
+            else:
+                options["pixel_width"] = width
+                options["pixel_height"] = height
+        elif arg in ("--fps", "--frame_rate") and value:
+            options["frame_rate"] = float(value)
+            i += 1
+        elif arg in ("-n", "--from_animation_number") and value:
+            first, _, last = value.partition(",")
+            options["from_animation_number"] = int(first)
+            if last:
+                options["upto_animation_number"] = int(last)
+            i += 1
+        elif arg == "--format" and value:
+            options["format"] = value
+            i += 1
+        elif arg.startswith("-") or arg.endswith(".py") or arg == "manim":
+            pass
+        else:
+            scene_names.append(arg)
+        i += 1
+
+    # quality has to be applied before any explicit resolution / fps overrides it
+    if "quality" in options:
+        options = {"quality": options.pop("quality"), **options}
+    return options, scene_names
+
+
+def _init_worker() -> None:
+    # the whole point: pay for numpy/cairo/pango/manim once per process
+    import manim  # noqa: F401
+
+    tex_cache.install()
+    partial_cache.install()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _render_job(script_path: str, scene_names: List[str], options: Dict[str, Any],
+                media_dir: str, output_name: str, cpus: Optional[Set[int]]) -> Optional[str]:
+    """Runs inside a worker. Returns None on success, or the formatted traceback."""
+    from manim import Scene, tempconfig
+
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+
+    module_name = f"mathinq_scene_{uuid.uuid4().hex}"
+    try:
+        spec = importlib.util.spec_from_file_location(module_name, script_path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+
+        scenes = [
+            obj for obj in vars(module).values()
+            if isinstance(obj, type) and issubclass(obj, Scene) and obj.__module__ == module_name
+        ]
+        named = [cls for cls in scenes if cls.__name__ in scene_names]
+        scenes = named or scenes
+        if not scenes:
+            raise Exception("No Scene class found in generated code.")
+
+        job_config = {
+            **options,
+            "media_dir": media_dir,
+            "video_dir": "{media_dir}/videos",
+            "output_file": output_name,
+            "tex_dir": str(tex_cache.TEX_CACHE_DIR),
+            "write_to_movie": True,
+            "progress_bar": "none",
+        }
+        # tempconfig restores the global config afterwards, so jobs don't leak settings
+        with tempconfig(job_config):
+            scenes[0]().render()
+        return None
+    except Exception:
+        return traceback.format_exc()
+    finally:
+        sys.modules.pop(module_name, None)
+        tex_cache.flush()
+        partial_cache.flush()
+
+
+class WarmRenderPool:
+    """
+    Pool of spawned processes with manim pre-imported. Workers are recycled after
+    max_jobs renders, and a crashed pool is rebuilt on the next submission.
+    """
+
+    def __init__(self, max_workers: int = WARM_WORKERS, max_jobs: int = WARM_WORKER_MAX_JOBS):
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    max_tasks_per_child=self.max_jobs,
+                )
+            return self._executor
+
+    def _reset(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def warm_up(self) -> None:
+        """Start every worker now instead of on the first render."""
+        executor = self._get_executor()
+        for future in [executor.submit(_ping) for _ in range(self.max_workers)]:
+            future.result()
+
+    def render(self, script_path: str, args: List[str], media_dir: str, output_name: str,
+               cpus: Optional[Set[int]] = None) -> None:
+        options, scene_names = parse_render_args(args)
+        # every render in flight dies with a crashed pool, whoever caused it, so each
+        # gets one more go on the rebuilt pool
+        for attempt in range(2):
+            executor = self._get_executor()
+            try:
+                error = executor.submit(
+                    _render_job, script_path, scene_names, options, media_dir, output_name, cpus
+                ).result()
+                break
+            except BrokenProcessPool:
+                self._reset(executor)
+                print(f"⚠️ Warm render worker crashed; pool restarted (attempt {attempt + 1}/2)")
+                # partial movie files the dead worker was writing may be truncated
+                shutil.rmtree(media_dir, ignore_errors=True)
+        else:
+            raise WarmWorkerCrashed("Warm render worker crashed twice rendering this scene.")
+        if error:
+            raise WarmRenderError(error)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+pool = WarmRenderPool()
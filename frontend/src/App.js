@@ -3,6 +3,29 @@ import "./App.css";
 import PracticeTab from "./practicetab";
 
 const BACKEND_URL = "http://localhost:8000"; // change if your backend is on a different host/port
+const JOB_POLL_MS = 1500;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Poll a queued /generate job until it finishes, returning its result
+async function waitForJob(jobId) {
+  while (true) {
+    const res = await fetch(`${BACKEND_URL}/jobs/${jobId}`);
+    if (!res.ok) {
+      const errData = await res.json().catch(() => ({}));
+      throw new Error(errData.detail || "Failed to fetch job status");
+    }
+
+    const job = await res.json();
+    if (job.status === "done") return job.result;
+    if (job.status === "failed") {
+      throw new Error(job.error || "Failed to generate video/audio");
+    }
+    if (job.status === "cancelled") throw new Error("Generation was cancelled.");
+
+    await sleep(JOB_POLL_MS);
+  }
+}
 
 function App() {
   const [prompt, setPrompt] = useState("");
@@ -65,9 +88,11 @@ function App() {
         throw new Error(errData.detail || "Failed to generate video/audio");
       }
 
-      const data = await res.json();
+      const { job_id: jobId } = await res.json();
+      const data = await waitForJob(jobId);
       setVideoUrl(`${BACKEND_URL}${data.video_url}`);
-      setAudioUrl(`${BACKEND_URL}${data.audio_url}`);
+      // audio_url is null when the narration is already muxed into the video
+      setAudioUrl(data.audio_url ? `${BACKEND_URL}${data.audio_url}` : "");
       setSampleId(data.sample_id || null);
 
       // 2) In parallel (or right after), generate practice problem for the SAME query
@@ -279,7 +304,7 @@ function App() {
                         ref={videoRef}
                         src={videoUrl}
                         controls
-                        muted={true}
+                        muted={Boolean(audioUrl)}
                         onPlay={handleVideoPlay}
                         onPause={handleVideoPause}
                         onLoadedMetadata={(e) => {